@@ -0,0 +1,54 @@
+-- SQL script to split the courses table into a course catalog and slim sections
+-- The title, description and prerequisites are the same for every section of a
+-- course, so they are stored once per (term, subject, course_number) in
+-- course_catalog instead of on every section row
+
+-- One row per course per term
+CREATE TABLE IF NOT EXISTS course_catalog (
+    term TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    course_number TEXT NOT NULL,
+    title TEXT,
+    course_description TEXT,
+    prerequisites TEXT,
+    prerequisite_type TEXT,            -- Advisory, Prerequisite or Corequisite
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (term, subject, course_number)
+);
+
+-- Copy the text already uploaded, taking the most recently updated section of each course
+INSERT INTO course_catalog (term, subject, course_number, title, course_description, prerequisites, prerequisite_type)
+SELECT DISTINCT ON (term, subject, course_number)
+       term, subject, course_number, title, course_description, prerequisites, prerequisite_type
+FROM courses
+WHERE subject IS NOT NULL AND course_number IS NOT NULL
+ORDER BY term, subject, course_number, updated_at DESC
+ON CONFLICT (term, subject, course_number) DO NOTHING;
+
+-- The per-section columns stay behind in sections
+ALTER TABLE courses RENAME TO sections;
+ALTER TABLE sections
+DROP COLUMN IF EXISTS title,
+DROP COLUMN IF EXISTS course_description,
+DROP COLUMN IF EXISTS prerequisites,
+DROP COLUMN IF EXISTS prerequisite_type;
+
+CREATE INDEX IF NOT EXISTS idx_sections_course ON sections(term, subject, course_number);
+
+-- The old wide shape, for readers that query courses
+CREATE OR REPLACE VIEW courses AS
+SELECT s.*,
+       c.title,
+       c.course_description,
+       c.prerequisites,
+       c.prerequisite_type
+FROM sections s
+LEFT JOIN course_catalog c USING (term, subject, course_number);
+
+ALTER TABLE course_catalog DISABLE ROW LEVEL SECURITY;
+
+-- Note: Run this SQL in the Supabase SQL Editor before the next orchestrator run.
+-- The courses view is read-only; the orchestrator now writes sections and course_catalog.
+-- The first run after this uploads every catalog row once; later runs only upsert courses whose text changed.
+-- If course_catalog is ever cleared, run
+-- `sqlite3 data/mirror.sqlite "DELETE FROM catalog"` so the next run uploads it again.
@@ -0,0 +1,52 @@
+-- SQL script to add the prerequisite graph tables in Supabase
+-- Prerequisite text is parsed into course references by prereqs.py, and the
+-- transitive closure is precomputed so prerequisite questions are simple lookups
+
+-- Add prerequisite_type column (Advisory, Prerequisite or Corequisite)
+ALTER TABLE courses
+ADD COLUMN IF NOT EXISTS prerequisite_type TEXT;
+
+COMMENT ON COLUMN courses.prerequisite_type IS 'Whether the prerequisites text is an Advisory, Prerequisite or Corequisite';
+
+-- One row per course per term with its parsed prerequisite text
+CREATE TABLE IF NOT EXISTS prereq_courses (
+    term TEXT NOT NULL,
+    course TEXT NOT NULL,              -- e.g. 'MATH 71'
+    prerequisite_type TEXT,
+    prerequisites TEXT,
+    text_hash TEXT NOT NULL,           -- used to rebuild only courses whose text changed
+    chain_depth INTEGER NOT NULL DEFAULT 0,  -- longest prerequisite chain leading to this course
+    PRIMARY KEY (term, course)
+);
+
+-- Direct references: course requires `requires` (kind: prerequisite, advisory or corequisite)
+CREATE TABLE IF NOT EXISTS prereq_edges (
+    term TEXT NOT NULL,
+    course TEXT NOT NULL,
+    requires TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    PRIMARY KEY (term, course, requires)
+);
+
+CREATE INDEX IF NOT EXISTS idx_prereq_edges_requires ON prereq_edges(term, requires);
+
+-- Transitive closure: `ancestor` must come `depth` steps (longest chain) before `course`
+-- Corequisites are not included
+CREATE TABLE IF NOT EXISTS prereq_closure (
+    term TEXT NOT NULL,
+    course TEXT NOT NULL,
+    ancestor TEXT NOT NULL,
+    depth INTEGER NOT NULL,
+    PRIMARY KEY (term, course, ancestor)
+);
+
+-- "What can I take after X?" looks up by ancestor
+CREATE INDEX IF NOT EXISTS idx_prereq_closure_ancestor ON prereq_closure(term, ancestor, depth);
+
+ALTER TABLE prereq_courses DISABLE ROW LEVEL SECURITY;
+ALTER TABLE prereq_edges DISABLE ROW LEVEL SECURITY;
+ALTER TABLE prereq_closure DISABLE ROW LEVEL SECURITY;
+
+-- Note: Run this SQL in the Supabase SQL Editor before the next orchestrator run.
+-- The first run after this builds the whole graph; later runs only touch courses whose text changed.
+-- If the tables are ever cleared, delete backend/state/prereqs_<term>.json so the graph is rebuilt.
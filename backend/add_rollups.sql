@@ -0,0 +1,52 @@
+-- SQL script to add the availability rollup tables in Supabase
+-- rollups.py keeps one row per (term, subject) up to date from the rows each
+-- run changed, so dashboard totals read O(subjects) rows instead of every course
+
+-- Current totals per subject
+CREATE TABLE IF NOT EXISTS subject_rollups (
+    term TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    sections INTEGER NOT NULL,
+    open_sections INTEGER NOT NULL,
+    seats_left INTEGER NOT NULL,
+    waitlisted INTEGER NOT NULL,
+    uccl_sections INTEGER NOT NULL,       -- sections with a UC credit limitation
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (term, subject)
+);
+
+-- Totals per term, summed from the subject rows
+CREATE OR REPLACE VIEW term_rollups AS
+SELECT term,
+       COUNT(*) AS subjects,
+       SUM(sections) AS sections,
+       SUM(open_sections) AS open_sections,
+       SUM(seats_left) AS seats_left,
+       SUM(waitlisted) AS waitlisted,
+       SUM(uccl_sections) AS uccl_sections,
+       MAX(updated_at) AS updated_at
+FROM subject_rollups
+GROUP BY term;
+
+-- Hourly copies of subject_rollups, recorded during registration (--snapshots)
+CREATE TABLE IF NOT EXISTS rollup_snapshots (
+    term TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    taken_at TIMESTAMPTZ NOT NULL,       -- start of the hour (UTC)
+    sections INTEGER NOT NULL,
+    open_sections INTEGER NOT NULL,
+    seats_left INTEGER NOT NULL,
+    waitlisted INTEGER NOT NULL,
+    uccl_sections INTEGER NOT NULL,
+    PRIMARY KEY (term, subject, taken_at)
+);
+
+CREATE INDEX IF NOT EXISTS idx_rollup_snapshots_term_time ON rollup_snapshots(term, taken_at);
+
+ALTER TABLE subject_rollups DISABLE ROW LEVEL SECURITY;
+ALTER TABLE rollup_snapshots DISABLE ROW LEVEL SECURITY;
+
+-- Note: Run this SQL in the Supabase SQL Editor before the next orchestrator run.
+-- The first run after this builds every subject from the local mirror; later runs only rewrite
+-- subjects whose sections changed. If the tables are ever cleared, run
+-- `sqlite3 data/mirror.sqlite "DELETE FROM rollups"` so the next run rebuilds them.
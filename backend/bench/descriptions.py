@@ -0,0 +1,90 @@
+# bench/descriptions.py
+"""
+Throughput benchmark for course description parsing.
+
+Compares the original per-call regex parsing with descriptions.py on recorded
+HTML samples (bench/recordings/*/descriptions/*.html) or synthetic ones, and
+checks both produce the same output.
+
+Usage (from backend/):
+    python -m bench.descriptions --repeat 20
+"""
+import argparse
+import glob
+import os
+import time
+
+from bench.fixtures import RECORDINGS_DIR, SUBJECTS, description_html
+from descriptions import parse_description_html
+
+def legacy_parse(html):
+    """Parsing as it was done inline in fetch_course_description before descriptions.py"""
+    import re
+
+    description = ""
+    prerequisites = None
+
+    prereq_match = re.search(r'&lt;b&gt;(Advisory|Prerequisite|Corequisite):?\s*&lt;/b&gt;&lt;i&gt;(.*?)&lt;/i&gt;', html, re.IGNORECASE | re.DOTALL)
+
+    if prereq_match:
+        prerequisites = prereq_match.group(2).strip()
+        html = html.replace(prereq_match.group(0), '')
+
+    desc_clean = re.sub(r'&lt;.*?&gt;', '', html)
+    desc_clean = re.sub(r'<.*?>', '', desc_clean)
+    desc_clean = re.sub(r'\s+', ' ', desc_clean).strip()
+
+    desc_clean = re.sub(r'(display course description|if there is a section description.*?|when there is no course.*?)', '', desc_clean, flags=re.IGNORECASE)
+    desc_clean = desc_clean.strip()
+
+    if desc_clean and desc_clean not in ['', 'None', 'N/A']:
+        description = desc_clean
+
+    return {
+        'description': description if description else None,
+        'prerequisites': prerequisites
+    }
+
+def load_samples(count=500):
+    """Recorded description pages if any exist, synthetic ones otherwise"""
+    paths = sorted(glob.glob(os.path.join(RECORDINGS_DIR, '*', 'descriptions', '*.html')))
+    if paths:
+        samples = []
+        for path in paths:
+            with open(path, 'r') as f:
+                samples.append(f.read())
+        return samples, 'recorded'
+    samples = [description_html(SUBJECTS[i % len(SUBJECTS)][0], str(i % 200 + 1), i) for i in range(count)]
+    return samples, 'synthetic'
+
+def time_parser(parse, samples, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html in samples:
+            parse(html)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark course description parsing')
+    parser.add_argument('--repeat', type=int, default=20, help='Passes over the samples (default: 20)')
+    args = parser.parse_args()
+
+    samples, source = load_samples()
+    mismatches = 0
+    for html in samples:
+        old, new = legacy_parse(html), parse_description_html(html)
+        if any(old[key] != new[key] for key in old):
+            mismatches += 1
+
+    legacy = time_parser(legacy_parse, samples, args.repeat)
+    current = time_parser(parse_description_html, samples, args.repeat)
+    parsed = len(samples) * args.repeat
+
+    print(f"📖 {len(samples)} {source} description pages x {args.repeat}")
+    print(f"   legacy:          {parsed / legacy:,.0f} pages/s")
+    print(f"   descriptions.py: {parsed / current:,.0f} pages/s ({legacy / current:.2f}x)")
+    if mismatches:
+        print(f"   ⚠️  {mismatches} pages parsed differently")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+# bench/fake_banner.py
+"""
+Local stand-in for the Banner SSB registration server.
+
+Implements the endpoints the scraper uses (term selection, class search page,
+get_subject, searchResults, getCourseDescription) on top of bench/fixtures.py,
+with configurable latency and error injection. Request counts per endpoint are
+kept so benchmarks can report them.
+"""
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from bench.fixtures import load_term
+
+SSB_PREFIX = "/StudentRegistrationSsb/ssb"
+
+CLASS_SEARCH_PAGE = """<!DOCTYPE html>
+<html><head>
+<meta name="synchronizerToken" content="bench-token-{token}">
+<title>Browse Classes</title>
+</head><body><div id="classSearch"></div></body></html>
+"""
+
+class FakeBanner:
+    """
+    Fake Banner server running in a background thread.
+
+    Args:
+        latency_ms: Mean added latency per request
+        jitter_ms: Uniform +/- jitter on top of latency_ms
+        error_rate: Fraction of data requests answered with a 500
+        subjects, sections_per_subject: Size of synthetic terms
+        bandwidth_kbps: Send response bodies at this many KiB/s (0 for unlimited)
+    """
+
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0.0, subjects=20, sections_per_subject=25,
+                 seed=0, port=0, bandwidth_kbps=0):
+        self.latency_ms = latency_ms
+        self.bandwidth_kbps = bandwidth_kbps
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.subjects = subjects
+        self.sections_per_subject = sections_per_subject
+        self.rng = random.Random(seed)
+        self.terms = {}
+        self.requests = Counter()
+        self.errors = Counter()
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}{SSB_PREFIX}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset_counts(self):
+        with self.lock:
+            self.requests.clear()
+            self.errors.clear()
+            self.bytes_sent = 0
+
+    def term(self, term_code):
+        with self.lock:
+            if term_code not in self.terms:
+                self.terms[term_code] = load_term(term_code, self.subjects, self.sections_per_subject)
+            return self.terms[term_code]
+
+    def _delay_and_maybe_fail(self, endpoint, injectable):
+        with self.lock:
+            self.requests[endpoint] += 1
+            delay = self.latency_ms + self.rng.uniform(-self.jitter_ms, self.jitter_ms)
+            fail = injectable and self.rng.random() < self.error_rate
+            if fail:
+                self.errors[endpoint] += 1
+        if delay > 0:
+            time.sleep(delay / 1000)
+        return fail
+
+    def _handler_class(self):
+        banner = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                self._dispatch(parse_qs(urlparse(self.path).query))
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length).decode() if length else ''
+                params = parse_qs(urlparse(self.path).query)
+                params.update(parse_qs(body))
+                self._dispatch(params)
+
+            def _dispatch(self, params):
+                path = urlparse(self.path).path
+                endpoint = path[len(SSB_PREFIX) + 1:] if path.startswith(SSB_PREFIX) else path
+                first = lambda name, default='': params.get(name, [default])[0]
+
+                # Session setup is never failed on purpose; data endpoints are
+                injectable = endpoint in ('classSearch/get_subject', 'searchResults/searchResults',
+                                          'searchResults/getCourseDescription')
+                if banner._delay_and_maybe_fail(endpoint, injectable):
+                    return self._send(500, 'text/html', '<html><body>Internal Server Error</body></html>')
+
+                if endpoint == 'term/termSelection':
+                    self._send(200, 'text/html', '<html><body>Select a term</body></html>')
+                elif endpoint == 'term/search':
+                    self._send(200, 'application/json', json.dumps({'fwdURL': f"{SSB_PREFIX}/classSearch/classSearch"}))
+                elif endpoint == 'classSearch/classSearch':
+                    self._send(200, 'text/html', CLASS_SEARCH_PAGE.format(token=banner.rng.randint(0, 10 ** 9)))
+                elif endpoint == 'classSearch/get_subject':
+                    subjects = banner.term(first('term')).subjects
+                    self._send(200, 'application/json', json.dumps(subjects))
+                elif endpoint == 'searchResults/searchResults':
+                    term = banner.term(first('txt_term'))
+                    body = term.search(first('txt_subject'), int(first('pageOffset', '0')),
+                                       int(first('pageMaxSize', '500')))
+                    self._send(200, 'application/json', body)
+                elif endpoint == 'searchResults/getCourseDescription':
+                    term = banner.term(first('term'))
+                    self._send(200, 'text/html', term.description(first('courseReferenceNumber')))
+                else:
+                    self._send(404, 'text/html', '<html><body>Not Found</body></html>')
+
+            def _send(self, status, content_type, body):
+                data = body.encode()
+                with banner.lock:
+                    banner.bytes_sent += len(data)
+                self.send_response(status)
+                self.send_header('Content-Type', f"{content_type}; charset=utf-8")
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                if not banner.bandwidth_kbps:
+                    self.wfile.write(data)
+                    return
+                # Trickle the body out, the way Banner sends a large page
+                piece = 16 * 1024
+                for i in range(0, len(data), piece):
+                    self.wfile.write(data[i:i + piece])
+                    self.wfile.flush()
+                    time.sleep(piece / (banner.bandwidth_kbps * 1024))
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run the fake Banner server on its own')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    banner = FakeBanner(args.latency_ms, args.jitter_ms, args.error_rate, port=args.port).start()
+    print(f"🧪 Fake Banner listening at {banner.base_url}")
+    print(f"   export MTSAC_BASE_URL={banner.base_url}")
+    try:
+        banner.thread.join()
+    except KeyboardInterrupt:
+        banner.stop()
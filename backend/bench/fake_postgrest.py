@@ -0,0 +1,160 @@
+# bench/fake_postgrest.py
+"""
+Stub Supabase/PostgREST endpoint for benchmarks.
+
+Accepts upserts to /rest/v1/<table>, keeps rows in memory keyed by the
+table's primary key, and answers simple selects and deletes. Tracks request counts and
+payload bytes so benchmarks can report upload cost.
+"""
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Primary key columns for tables the pipeline writes to
+PRIMARY_KEYS = {
+    'sections': ('crn',),
+    'course_catalog': ('term', 'subject', 'course_number'),
+    'prereq_courses': ('term', 'course'),
+    'prereq_edges': ('term', 'course', 'requires'),
+    'prereq_closure': ('term', 'course', 'ancestor'),
+    'subject_rollups': ('term', 'subject'),
+    'rollup_snapshots': ('term', 'subject', 'taken_at'),
+}
+
+# Any three dot-separated parts pass supabase-py's API key check
+BENCH_SERVICE_KEY = "bench.bench.bench"
+
+class FakePostgrest:
+    """In-memory PostgREST stand-in running in a background thread"""
+
+    def __init__(self, latency_ms=0, port=0):
+        self.latency_ms = latency_ms
+        self.tables = {}
+        self.requests = Counter()
+        self.bytes_received = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset_counts(self):
+        with self.lock:
+            self.requests.clear()
+            self.bytes_received = 0
+
+    def row_count(self, table):
+        with self.lock:
+            return len(self.tables.get(table, {}))
+
+    def _upsert(self, table, rows, on_conflict=None):
+        key_columns = tuple(on_conflict.split(',')) if on_conflict else PRIMARY_KEYS.get(table, ('id',))
+        with self.lock:
+            stored = self.tables.setdefault(table, {})
+            for row in rows:
+                key = tuple(row.get(column) for column in key_columns)
+                stored[key] = {**stored.get(key, {}), **row}
+
+    @staticmethod
+    def _filter(rows, params):
+        """Apply eq. and in.() filters from a PostgREST query string"""
+        for column, values in params.items():
+            if column in ('select', 'order', 'limit', 'offset', 'on_conflict'):
+                continue
+            value = values[0]
+            if value.startswith('eq.'):
+                rows = [r for r in rows if str(r.get(column)) == value[3:]]
+            elif value.startswith('in.(') and value.endswith(')'):
+                allowed = {v.strip().strip('"') for v in value[4:-1].split(',')}
+                rows = [r for r in rows if str(r.get(column)) in allowed]
+        return rows
+
+    def _select(self, table, params):
+        with self.lock:
+            rows = list(self.tables.get(table, {}).values())
+        rows = self._filter(rows, params)
+        offset = int(params.get('offset', ['0'])[0])
+        limit = params.get('limit')
+        rows = rows[offset:offset + int(limit[0])] if limit else rows[offset:]
+        return rows
+
+    def _delete(self, table, params):
+        with self.lock:
+            stored = self.tables.get(table, {})
+            doomed = {id(row) for row in self._filter(list(stored.values()), params)}
+            for key in [key for key, row in stored.items() if id(row) in doomed]:
+                del stored[key]
+
+    def _handler_class(self):
+        postgrest = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _table(self):
+                path = urlparse(self.path).path
+                return path.rsplit('/', 1)[-1] if path.startswith('/rest/v1/') else None
+
+            def _wait(self):
+                with postgrest.lock:
+                    postgrest.requests[f"{self.command} {self._table()}"] += 1
+                if postgrest.latency_ms:
+                    time.sleep(postgrest.latency_ms / 1000)
+
+            def do_POST(self):
+                self._wait()
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length)
+                with postgrest.lock:
+                    postgrest.bytes_received += len(body)
+                rows = json.loads(body or b'[]')
+                if isinstance(rows, dict):
+                    rows = [rows]
+                on_conflict = parse_qs(urlparse(self.path).query).get('on_conflict', [None])[0]
+                postgrest._upsert(self._table(), rows, on_conflict)
+
+                if 'return=minimal' in (self.headers.get('Prefer') or ''):
+                    self._send(201, '')
+                else:
+                    self._send(201, json.dumps(rows))
+
+            do_PATCH = do_POST
+
+            def do_GET(self):
+                self._wait()
+                rows = postgrest._select(self._table(), parse_qs(urlparse(self.path).query))
+                self._send(200, json.dumps(rows))
+
+            def do_DELETE(self):
+                self._wait()
+                self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                postgrest._delete(self._table(), parse_qs(urlparse(self.path).query))
+                self._send(200, '[]')
+
+            def _send(self, status, body):
+                data = body.encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
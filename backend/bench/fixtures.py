@@ -0,0 +1,227 @@
+# bench/fixtures.py
+"""
+Banner responses for the fake server.
+
+Recorded responses (see bench/record.py) are used when they exist for a term.
+Otherwise a deterministic synthetic term is generated with the same shape as
+Banner's JSON and HTML, so benchmarks run the same way on every machine.
+"""
+import json
+import os
+import random
+
+RECORDINGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recordings")
+
+SUBJECTS = [
+    ('ACCT', 'Accounting'), ('AMLA', 'American Sign Language'), ('ANTH', 'Anthropology'),
+    ('ARCH', 'Architecture'), ('ART', 'Art'), ('BIOL', 'Biology'), ('BUSM', 'Business Management'),
+    ('CHEM', 'Chemistry'), ('CHLD', 'Child Development'), ('CISB', 'Computer Info Systems'),
+    ('CISP', 'Computer Programming'), ('COMM', 'Communication'), ('CSCI', 'Computer Science'),
+    ('DNCE', 'Dance'), ('ECON', 'Economics'), ('ENGL', 'English'), ('ENGR', 'Engineering'),
+    ('FREN', 'French'), ('GEOG', 'Geography'), ('GEOL', 'Geology'), ('HIST', 'History'),
+    ('HLTH', 'Health Education'), ('KIN', 'Kinesiology'), ('LERN', 'Learning Assistance'),
+    ('MATH', 'Mathematics'), ('MUS', 'Music'), ('NURS', 'Nursing'), ('PHIL', 'Philosophy'),
+    ('PHYS', 'Physics'), ('POLS', 'Political Science'), ('PSYC', 'Psychology'), ('READ', 'Reading'),
+    ('SOC', 'Sociology'), ('SPAN', 'Spanish'), ('STAT', 'Statistics'), ('THEA', 'Theater'),
+]
+
+SCHEDULE_TYPES = ['Lecture', 'Laboratory', 'Lecture/Lab', 'Activity']
+METHODS = ['In Person', 'Online', 'Hybrid', 'Online - Live']
+CAMPUSES = ['Walnut Campus', 'Online', 'Rancho Cucamonga']
+BUILDINGS = ['Building 26A', 'Building 60', 'Building 61', 'Building 4', 'Building 13']
+FIRST_NAMES = ['Alex', 'Maria', 'John', 'Linh', 'Priya', 'Carlos', 'Grace', 'Omar', 'Sofia', 'Wei']
+LAST_NAMES = ['Nguyen', 'Garcia', 'Smith', 'Chen', 'Patel', 'Lopez', 'Kim', 'Johnson', 'Hernandez', 'Lee']
+TIMES = [('0800', '0925'), ('0930', '1055'), ('1100', '1225'), ('1300', '1425'), ('1800', '2050')]
+
+FILLER = (
+    "Students will study the principles and methods of the discipline, including analysis, "
+    "problem solving and written communication. Topics include foundational theory, applications "
+    "and current practice. Emphasis is placed on critical thinking and collaborative work."
+)
+
+def term_description(term_code):
+    seasons = {'10': 'Winter', '30': 'Fall', '40': 'Spring', '50': 'Summer'}
+    return f"{seasons.get(term_code[4:], 'Term')} {term_code[:4]}"
+
+class SyntheticTerm:
+    """Deterministic fake course data for one term"""
+
+    def __init__(self, term_code, subjects=20, sections_per_subject=25, seed=0):
+        self.term_code = term_code
+        self.subjects = [{'code': code, 'description': desc} for code, desc in SUBJECTS[:subjects]]
+        self.courses_by_subject = {}
+        self.courses_by_crn = {}
+
+        rng = random.Random(f"{term_code}-{seed}")
+        crn = 10000
+        for subject in self.subjects:
+            courses = []
+            course_numbers = sorted(rng.sample(range(1, 300), max(1, sections_per_subject // 4)))
+            for i in range(sections_per_subject):
+                crn += 1
+                course_number = str(rng.choice(course_numbers))
+                courses.append(self._course(rng, str(crn), subject, course_number, i + 1))
+            self.courses_by_subject[subject['code']] = courses
+            for course in courses:
+                self.courses_by_crn[course['courseReferenceNumber']] = course
+
+    def _course(self, rng, crn, subject, course_number, sequence):
+        capacity = rng.choice([25, 30, 35, 40, 45])
+        enrolled = rng.randint(0, capacity)
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        begin, end = rng.choice(TIMES)
+        days = rng.choice([('monday', 'wednesday'), ('tuesday', 'thursday'), ('friday',), ()])
+        meeting_time = {
+            'beginTime': begin if days else None,
+            'endTime': end if days else None,
+            'building': 'BLDG',
+            'buildingDescription': rng.choice(BUILDINGS) if days else None,
+            'campus': 'W',
+            'campusDescription': 'Walnut Campus',
+            'category': '01',
+            'courseReferenceNumber': crn,
+            'creditHourSession': 3.0,
+            'startDate': '01/26/2026',
+            'endDate': '05/22/2026',
+            'hoursWeek': 3.0,
+            'meetingScheduleType': 'LEC',
+            'meetingType': 'CLAS',
+            'meetingTypeDescription': 'Class',
+            'room': str(rng.randint(1000, 3999)) if days else None,
+            'term': self.term_code,
+        }
+        for day in ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday'):
+            meeting_time[day] = day in days
+
+        attributes = []
+        if rng.random() < 0.15:
+            attributes.append({'code': 'UCCL', 'description': 'UC Credit Limitation', 'courseReferenceNumber': crn,
+                               'isZTCAttribute': False, 'termCode': self.term_code})
+        if rng.random() < 0.3:
+            attributes.append({'code': 'ZTC', 'description': 'Zero Textbook Cost', 'courseReferenceNumber': crn,
+                               'isZTCAttribute': True, 'termCode': self.term_code})
+
+        return {
+            'id': int(crn),
+            'term': self.term_code,
+            'termDesc': term_description(self.term_code),
+            'courseReferenceNumber': crn,
+            'partOfTerm': '1',
+            'courseNumber': course_number,
+            'subject': subject['code'],
+            'subjectDescription': subject['description'],
+            'sequenceNumber': f"{sequence:02d}",
+            'campusDescription': rng.choice(CAMPUSES),
+            'scheduleTypeDescription': rng.choice(SCHEDULE_TYPES),
+            'courseTitle': f"{subject['description']} {course_number}",
+            'creditHours': None,
+            'maximumEnrollment': capacity,
+            'enrollment': enrolled,
+            'seatsAvailable': capacity - enrolled,
+            'waitCapacity': 10,
+            'waitCount': rng.randint(0, 10) if enrolled == capacity else 0,
+            'waitAvailable': 10,
+            'crossList': None,
+            'crossListCapacity': None,
+            'crossListCount': None,
+            'crossListAvailable': None,
+            'creditHourHigh': None,
+            'creditHourLow': 3,
+            'creditHourIndicator': None,
+            'openSection': enrolled < capacity,
+            'linkIdentifier': None,
+            'isSectionLinked': False,
+            'subjectCourse': f"{subject['code']}{course_number}",
+            'faculty': [{
+                'bannerId': str(rng.randint(100000, 999999)),
+                'category': None,
+                'class': 'net.hedtech.banner.student.faculty.FacultyResultDecorator',
+                'courseReferenceNumber': crn,
+                'displayName': f"{last}, {first}",
+                'emailAddress': f"{first[0].lower()}{last.lower()}@mtsac.edu",
+                'primaryIndicator': True,
+                'term': self.term_code,
+            }],
+            'meetingsFaculty': [{
+                'category': '01',
+                'class': 'net.hedtech.banner.student.schedule.SectionSessionDecorator',
+                'courseReferenceNumber': crn,
+                'faculty': [],
+                'meetingTime': meeting_time,
+                'term': self.term_code,
+            }],
+            'reservedSeatSummary': None,
+            'sectionAttributes': attributes,
+            'instructionalMethod': 'INP',
+            'instructionalMethodDescription': rng.choice(METHODS),
+        }
+
+    def search(self, subject_code, offset=0, max_size=500):
+        """searchResults/searchResults response for a subject ('' for all subjects)"""
+        if subject_code:
+            courses = self.courses_by_subject.get(subject_code, [])
+        else:
+            courses = [c for s in self.subjects for c in self.courses_by_subject[s['code']]]
+        page = courses[offset:offset + max_size]
+        return json.dumps({
+            'success': True,
+            'totalCount': len(courses),
+            'data': page,
+            'pageOffset': offset,
+            'pageMaxSize': max_size,
+            'sectionsFetchedCount': len(page),
+            'pathMode': 'search',
+        })
+
+    def description(self, crn):
+        """searchResults/getCourseDescription response for a CRN"""
+        course = self.courses_by_crn.get(crn)
+        if course is None:
+            return '<section aria-labelledby="courseDescription">No course description is available.</section>'
+        return description_html(course['subject'], course['courseNumber'], self.term_code)
+
+def description_html(subject, course_number, seed=''):
+    """Banner-style description HTML with an optional escaped prerequisite block"""
+    rng = random.Random(f"{subject}{course_number}{seed}")
+    parts = ['<section aria-labelledby="courseDescription">\n    <h3 class="course-description-header">Display course description</h3>\n    ']
+    kind = rng.choice(['Prerequisite', 'Advisory', 'Corequisite', None, None])
+    if kind:
+        other = rng.choice(SUBJECTS)[0]
+        parts.append(f"&lt;b&gt;{kind}:&lt;/b&gt;&lt;i&gt;{other} {rng.randint(1, 150)} or equivalent"
+                     f" with a grade of C or better&lt;/i&gt;")
+    parts.append(f"&lt;p&gt;{FILLER * rng.randint(1, 3)}&lt;/p&gt;")
+    parts.append('\n</section>')
+    return ''.join(parts)
+
+class RecordedTerm:
+    """Responses captured from Banner by bench/record.py"""
+
+    def __init__(self, term_code, directory):
+        self.term_code = term_code
+        self.directory = directory
+        with open(os.path.join(directory, 'subjects.json'), 'r') as f:
+            self.subjects = json.load(f)
+
+    def search(self, subject_code, offset=0, max_size=500):
+        path = os.path.join(self.directory, 'search', f"{subject_code or '_all'}.json")
+        if not os.path.exists(path):
+            return json.dumps({'success': True, 'totalCount': 0, 'data': []})
+        with open(path, 'r') as f:
+            data = json.load(f)
+        courses = data.get('data') or []
+        data['data'] = courses[offset:offset + max_size]
+        return json.dumps(data)
+
+    def description(self, crn):
+        path = os.path.join(self.directory, 'descriptions', f"{crn}.html")
+        if not os.path.exists(path):
+            return '<section aria-labelledby="courseDescription">No course description is available.</section>'
+        with open(path, 'r') as f:
+            return f.read()
+
+def load_term(term_code, subjects=20, sections_per_subject=25):
+    """Recorded responses for a term if present, synthetic ones otherwise"""
+    directory = os.path.join(RECORDINGS_DIR, term_code)
+    if os.path.exists(os.path.join(directory, 'subjects.json')):
+        return RecordedTerm(term_code, directory)
+    return SyntheticTerm(term_code, subjects=subjects, sections_per_subject=sections_per_subject)
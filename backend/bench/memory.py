@@ -0,0 +1,179 @@
+# bench/memory.py
+"""
+Memory benchmark for holding transformed courses: a list of dicts (as the
+pipeline did before coursestore.py) against CourseStore.
+
+Synthetic terms are serialized and parsed back, so every string is a separate
+object the way it is after decoding a Banner response. Each container is built
+from the parsed courses, the raw courses are dropped, and what the container
+alone keeps alive is measured with tracemalloc. The time to build the container
+and to read every row back (as the diff and upload stages do) is reported too.
+
+With --pipeline, one term is also run through process_term against the fake
+Banner and PostgREST servers, twice: once against an empty mirror and once as
+every later run sees it. The memory still in use when the upload starts (after
+the raw courses should have been freed) and when the rollups start (with the
+mirrored rows loaded for the diff) is reported with the peak, so anything
+holding on to scraped courses or mirrored rows shows up.
+
+Usage (from backend/):
+    python -m bench.memory
+    python -m bench.memory --terms 8 --sections 80
+    python -m bench.memory --pipeline
+"""
+import argparse
+import gc
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from bench.fake_banner import FakeBanner
+from bench.fake_postgrest import BENCH_SERVICE_KEY, FakePostgrest
+from bench.fixtures import SUBJECTS, SyntheticTerm
+from coursestore import CourseStore
+
+TERM = '202640'
+
+def banner_payload(terms, subjects, sections):
+    courses = []
+    for i in range(terms):
+        term = SyntheticTerm(f"{2026 + i // 4}{(10, 30, 40, 50)[i % 4]}", subjects=subjects, sections_per_subject=sections)
+        for subject_courses in term.courses_by_subject.values():
+            courses.extend(subject_courses)
+    return json.dumps(courses)
+
+def add_descriptions(rows):
+    """Catalog text as fetch_descriptions_for leaves it: one string shared by every section of a course"""
+    texts = {}
+    for row in rows:
+        key = (row['term'], row['subject'], row['course_number'])
+        if key not in texts:
+            texts[key] = (f"Covers the core topics of {row['title']} with applications. " * 6).strip()
+        row['course_description'] = texts[key]
+        row['prerequisites'] = 'Completion of MATH 71 with a grade of C or better.'
+
+def build_dicts(courses, updated_at):
+    # Imported here so MTSAC_BASE_URL / SUPABASE_URL are already set for --pipeline
+    from orchestrator import transform_course
+    return [transform_course(course, updated_at=updated_at) for course in courses]
+
+def build_store(courses, updated_at):
+    from orchestrator import transform_course
+    store = CourseStore()
+    for course in courses:
+        store.append(transform_course(course, updated_at=updated_at))
+    return store
+
+def measure(build, payload):
+    """(retained bytes, peak bytes, build seconds, read seconds, rows)"""
+    gc.collect()
+    tracemalloc.start()
+    courses = json.loads(payload)
+    start = time.perf_counter()
+    container = build(courses, time.strftime('%Y-%m-%dT%H:%M:%S'))
+    add_descriptions(container)
+    build_seconds = time.perf_counter() - start
+    del courses
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for row in container:
+        {**row}
+    read_seconds = time.perf_counter() - start
+    return retained, peak, build_seconds, read_seconds, len(container)
+
+def run_term(scratch):
+    """
+    Run TERM through process_term in `scratch`. Returns (rows uploaded, memory in
+    use when the upload starts, when the rollups start, peak).
+    """
+    import metrics
+    import orchestrator
+
+    profile_stage = metrics.profile_stage
+    in_use = {}
+
+    @contextmanager
+    def sampled(stage, term_code=None):
+        if stage in ('upload', 'rollups'):
+            gc.collect()
+            in_use[stage] = tracemalloc.get_traced_memory()[0]
+        with profile_stage(stage, term_code) as handle:
+            yield handle
+
+    cwd = os.getcwd()
+    os.chdir(scratch)
+    metrics.profile_stage = sampled
+    gc.collect()
+    tracemalloc.start()
+    try:
+        uploaded, _ = orchestrator.process_term(TERM, resume=False, fetch_descriptions=True)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        metrics.profile_stage = profile_stage
+        os.chdir(cwd)
+    return uploaded, in_use.get('upload', 0), in_use.get('rollups', 0), peak
+
+def measure_pipeline(postgrest):
+    """Measurements of a first run against an empty mirror and of the run after it"""
+    # The first run builds the synthetic term in the fake server, so it isn't counted
+    with tempfile.TemporaryDirectory() as scratch:
+        run_term(scratch)
+    with postgrest.lock:
+        postgrest.tables.clear()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        results['first run'] = run_term(scratch)
+        results['rerun'] = run_term(scratch)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare memory use of list-of-dicts and CourseStore')
+    parser.add_argument('--terms', type=int, default=4, help='Synthetic terms (default: 4)')
+    parser.add_argument('--subjects', type=int, default=len(SUBJECTS), help=f'Subjects per term (default: {len(SUBJECTS)})')
+    parser.add_argument('--sections', type=int, default=40, help='Sections per subject (default: 40)')
+    parser.add_argument('--pipeline', action='store_true', help='Also measure one term through process_term')
+    args = parser.parse_args()
+
+    if args.pipeline:
+        banner = FakeBanner(subjects=args.subjects, sections_per_subject=args.sections).start()
+        postgrest = FakePostgrest().start()
+        os.environ['MTSAC_BASE_URL'] = banner.base_url
+        os.environ['SUPABASE_URL'] = postgrest.url
+        os.environ['SUPABASE_SERVICE_KEY'] = BENCH_SERVICE_KEY
+
+    payload = banner_payload(args.terms, args.subjects, args.sections)
+
+    results = {}
+    for name, build in (('list of dicts', build_dicts), ('CourseStore', build_store)):
+        results[name] = measure(build, payload)
+
+    rows = results['list of dicts'][4]
+    print(f"🧠 {rows} sections ({args.terms} terms x {args.subjects} subjects x {args.sections} sections)")
+    for name, (retained, peak, build_seconds, read_seconds, _) in results.items():
+        print(f"   {name:<14} {retained / 1024 / 1024:7.2f} MiB retained ({retained / rows:,.0f} B/section), "
+              f"peak {peak / 1024 / 1024:.1f} MiB, build {build_seconds:.2f}s, read {read_seconds:.2f}s")
+    before, after = results['list of dicts'][0], results['CourseStore'][0]
+    print(f"   CourseStore keeps {after / before:.0%} of the list-of-dicts memory")
+
+    if args.pipeline:
+        try:
+            pipeline = measure_pipeline(postgrest)
+        finally:
+            banner.stop()
+            postgrest.stop()
+        print(f"\n🧠 process_term, {pipeline['first run'][0]} sections in one term")
+        for name, (rows, at_upload, at_rollups, peak) in pipeline.items():
+            print(f"   {name:<10} {at_upload / 1024 / 1024:6.2f} MiB in use when the upload starts, "
+                  f"{at_rollups / 1024 / 1024:.2f} MiB when the rollups start "
+                  f"({at_rollups / max(rows, 1):,.0f} B/section), peak {peak / 1024 / 1024:.1f} MiB")
+
+if __name__ == "__main__":
+    main()
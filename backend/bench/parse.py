@@ -0,0 +1,123 @@
+# bench/parse.py
+"""
+Parse benchmark for a large searchResults page: response.json() followed by
+the transform (as the direct search did before searchresults.py) against
+streaming the courses out of the response straight into the transform.
+
+The page is served over HTTP by the fake Banner server, running in a child
+process so its own buffers aren't counted. For each approach the
+wall time (best of --repeat runs) and the peak traced memory while turning the
+response into a CourseStore are reported, along with how far that peak rises
+above what the finished CourseStore keeps (the cost of parsing itself). With
+--bandwidth-kbps the server trickles the page out like Banner does, and the
+streamed parse overlaps the download instead of waiting for it.
+
+Usage (from backend/):
+    python -m bench.parse
+    python -m bench.parse --sections 300 --repeat 5
+    python -m bench.parse --bandwidth-kbps 4096       # a server slower than the parser
+"""
+import argparse
+import gc
+import multiprocessing
+import socket
+import time
+import tracemalloc
+
+import requests
+
+from bench.fake_banner import SSB_PREFIX, FakeBanner
+from bench.fixtures import SUBJECTS
+from coursestore import CourseStore
+from orchestrator import transform_course
+from searchresults import CHUNK_SIZE, SearchResults
+
+TERM = '202640'
+
+def serve(port, subjects, sections, bandwidth_kbps):
+    FakeBanner(subjects=subjects, sections_per_subject=sections, port=port,
+               bandwidth_kbps=bandwidth_kbps).server.serve_forever()
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def search(session, url, stream):
+    form_data = {"txt_term": TERM, "txt_subject": "", "pageOffset": "0", "pageMaxSize": "5000"}
+    response = session.post(url, data=form_data, stream=stream)
+    response.raise_for_status()
+    return response
+
+def buffered(session, url, updated_at):
+    courses = search(session, url, stream=False).json().get('data') or []
+    store = CourseStore()
+    for course in courses:
+        store.append(transform_course(course, updated_at=updated_at))
+    courses.clear()
+    return store
+
+def streamed(session, url, updated_at):
+    store = CourseStore()
+    with search(session, url, stream=True) as response:
+        for course in SearchResults(response.iter_content(CHUNK_SIZE)):
+            store.append(transform_course(course, updated_at=updated_at))
+    return store
+
+def measure(build, session, url, repeat):
+    """(best seconds, peak bytes, retained bytes, rows)"""
+    updated_at = time.strftime('%Y-%m-%dT%H:%M:%S')
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        rows = len(build(session, url, updated_at))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    gc.collect()
+    tracemalloc.start()
+    store = build(session, url, updated_at)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del store
+    return best, peak, retained, rows
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare buffered and streamed parsing of a large searchResults page')
+    parser.add_argument('--subjects', type=int, default=len(SUBJECTS), help=f'Subjects in the term (default: {len(SUBJECTS)})')
+    parser.add_argument('--sections', type=int, default=140, help='Sections per subject (default: 140)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per approach (default: 3)')
+    parser.add_argument('--bandwidth-kbps', type=int, default=0,
+                        help='Limit the server to this many KiB/s, so parsing can overlap the download (default: unlimited)')
+    args = parser.parse_args()
+
+    port = free_port()
+    server = multiprocessing.Process(target=serve, args=(port, args.subjects, args.sections, args.bandwidth_kbps), daemon=True)
+    server.start()
+    url = f"http://127.0.0.1:{port}{SSB_PREFIX}/searchResults/searchResults"
+    session = requests.Session()
+    try:
+        for _ in range(50):
+            try:
+                # Also builds the synthetic term before timing
+                page_bytes = len(search(session, url, stream=False).content)
+                break
+            except requests.ConnectionError:
+                time.sleep(0.1)
+        results = {}
+        for name, build in (('response.json()', buffered), ('streamed', streamed)):
+            results[name] = measure(build, session, url, args.repeat)
+    finally:
+        server.terminate()
+
+    rows = results['streamed'][3]
+    print(f"🧵 {rows} sections in one searchResults page ({page_bytes / 1024 / 1024:.1f} MiB)")
+    for name, (seconds, peak, retained, _) in results.items():
+        print(f"   {name:<16} {seconds * 1000:7.0f} ms, peak {peak / 1024 / 1024:6.1f} MiB "
+              f"({(peak - retained) / 1024 / 1024:.1f} MiB above the CourseStore)")
+    before, after = results['response.json()'], results['streamed']
+    print(f"   Streaming takes {after[0] / before[0]:.0%} of the time and {after[1] / before[1]:.0%} of the peak memory")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# bench/record.py
+"""
+Record real Banner responses for the fake server.
+
+Saves the subject list, every subject's search results and a sample of
+course description pages for a term under bench/recordings/<term>/.
+Recordings contain instructor names and emails, so they stay out of git.
+
+Usage (from backend/):
+    python -m bench.record 202640 --descriptions 300
+"""
+import argparse
+import json
+import os
+import random
+
+from bench.fixtures import RECORDINGS_DIR
+from config import BASE_URL
+from scraper import get_subjects, request_with_retry, setup_session
+
+def record_term(term_code, description_samples=200, page_size=500):
+    directory = os.path.join(RECORDINGS_DIR, term_code)
+    os.makedirs(os.path.join(directory, 'search'), exist_ok=True)
+    os.makedirs(os.path.join(directory, 'descriptions'), exist_ok=True)
+
+    subjects = get_subjects(term_code)
+    with open(os.path.join(directory, 'subjects.json'), 'w') as f:
+        json.dump(subjects, f)
+    print(f"📁 {len(subjects)} subjects")
+
+    session, headers = setup_session(term_code, BASE_URL)
+    crns = []
+    for subject in subjects:
+        response = request_with_retry(session, "POST", f"{BASE_URL}/searchResults/searchResults", data={
+            "txt_term": term_code,
+            "txt_subject": subject['code'],
+            "pageOffset": "0",
+            "pageMaxSize": str(page_size),
+            "sortColumn": "subjectDescription",
+            "sortDirection": "asc"
+        }, headers=headers)
+        with open(os.path.join(directory, 'search', f"{subject['code']}.json"), 'w') as f:
+            f.write(response.text)
+        data = response.json().get('data') or []
+        crns.extend(c['courseReferenceNumber'] for c in data)
+        print(f"  ✓ {subject['code']}: {len(data)} sections")
+
+        # Banner ties search results to the session, so start clean for the next subject
+        request_with_retry(session, "POST", f"{BASE_URL}/classSearch/resetDataForm", headers=headers)
+
+    sample = random.Random(term_code).sample(crns, min(description_samples, len(crns)))
+    for crn in sample:
+        response = request_with_retry(session, "GET", f"{BASE_URL}/searchResults/getCourseDescription",
+                                      params={'term': term_code, 'courseReferenceNumber': crn}, headers=headers)
+        with open(os.path.join(directory, 'descriptions', f"{crn}.html"), 'w') as f:
+            f.write(response.text)
+    print(f"✅ Recorded {len(crns)} sections and {len(sample)} descriptions to {directory}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Record Banner responses for offline benchmarks')
+    parser.add_argument('term', help='Term code to record (e.g., 202640)')
+    parser.add_argument('--descriptions', type=int, default=200, help='Number of description pages to sample')
+    args = parser.parse_args()
+    record_term(args.term, args.descriptions)
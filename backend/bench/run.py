@@ -0,0 +1,161 @@
+# bench/run.py
+"""
+Offline benchmark runner.
+
+Starts the fake Banner server and the stub PostgREST endpoint, points the
+scraper and uploader at them, runs named scenarios through the real
+orchestrator code and reports wall time, request counts and memory.
+
+Usage (from backend/):
+    python -m bench.run                          # all scenarios
+    python -m bench.run --scenario full_term --latency-ms 20 --error-rate 0.02
+    python -m bench.run --json results.json      # save results
+    python -m bench.run --baseline results.json  # fail on regressions
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from bench.fake_banner import FakeBanner
+from bench.fake_postgrest import BENCH_SERVICE_KEY, FakePostgrest
+
+# Each scenario is a list of (term_code, fetch_descriptions) passes
+SCENARIOS = {
+    'full_term': [('202640', True)],
+    'multi_term': [('202630', True), ('202640', True), ('202650', True)],
+    'seats_only': [('202640', False)],
+    # The same term twice, as every scheduled run after the first sees it
+    'rerun': [('202640', True), ('202640', True)],
+}
+
+def run_scenario(name, banner, postgrest):
+    """Run one scenario in a scratch directory and return its measurements"""
+    # Imported here so MTSAC_BASE_URL / SUPABASE_URL are already set
+    import metrics
+    import orchestrator
+
+    banner.reset_counts()
+    postgrest.reset_counts()
+    metrics.reset()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        tracemalloc.start()
+        start = time.perf_counter()
+        uploaded = errors = 0
+        try:
+            for term_code, fetch_descriptions in SCENARIOS[name]:
+                success, failed = orchestrator.process_term(term_code, resume=False, fetch_descriptions=fetch_descriptions)
+                uploaded += success
+                errors += failed
+        finally:
+            wall = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            os.chdir(cwd)
+
+    return {
+        'scenario': name,
+        'wall_seconds': round(wall, 3),
+        'banner_requests': sum(banner.requests.values()),
+        'banner_requests_by_endpoint': dict(banner.requests),
+        'banner_errors_injected': sum(banner.errors.values()),
+        'banner_bytes': banner.bytes_sent,
+        'supabase_requests': sum(postgrest.requests.values()),
+        'supabase_bytes': postgrest.bytes_received,
+        'rows_uploaded': uploaded,
+        'errors': errors,
+        'peak_traced_mib': round(peak / 1024 / 1024, 2),
+        'peak_rss_mib': round((metrics.peak_rss_bytes() or 0) / 1024 / 1024, 2),
+    }
+
+def compare(results, baseline, threshold):
+    """Return a list of regression messages against a previous results file"""
+    previous = {r['scenario']: r for r in baseline.get('results', [])}
+    regressions = []
+    for result in results:
+        before = previous.get(result['scenario'])
+        if not before:
+            continue
+        for key in ('wall_seconds', 'banner_requests', 'supabase_bytes', 'peak_traced_mib'):
+            old, new = before.get(key), result.get(key)
+            if old and new and new > old * (1 + threshold):
+                regressions.append(f"{result['scenario']}: {key} {old} → {new} (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+def print_result(result):
+    print(f"\n📊 {result['scenario']}")
+    print(f"   Wall time:         {result['wall_seconds']:.2f}s")
+    print(f"   Banner requests:   {result['banner_requests']} ({result['banner_errors_injected']} errors injected)")
+    for endpoint, count in sorted(result['banner_requests_by_endpoint'].items()):
+        print(f"     {endpoint}: {count}")
+    print(f"   Banner bytes:      {result['banner_bytes'] / 1024:.0f} KiB")
+    print(f"   Supabase requests: {result['supabase_requests']} ({result['supabase_bytes'] / 1024:.0f} KiB sent)")
+    print(f"   Rows uploaded:     {result['rows_uploaded']} ({result['errors']} errors)")
+    print(f"   Peak memory:       {result['peak_traced_mib']} MiB traced, {result['peak_rss_mib']} MiB RSS")
+
+def main():
+    parser = argparse.ArgumentParser(description='Run offline benchmarks against a fake Banner server')
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), action='append',
+                        help='Scenario to run (repeatable, default: all)')
+    parser.add_argument('--subjects', type=int, default=20, help='Subjects per synthetic term (default: 20)')
+    parser.add_argument('--sections', type=int, default=25, help='Sections per subject (default: 25)')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Added Banner latency per request')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Random +/- jitter on Banner latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of Banner data requests that return 500')
+    parser.add_argument('--supabase-latency-ms', type=float, default=0, help='Added latency per Supabase request')
+    parser.add_argument('--json', help='Save results to this file')
+    parser.add_argument('--baseline', help='Compare against a previous --json file')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Allowed slowdown before failing (default: 0.10)')
+    args = parser.parse_args()
+
+    banner = FakeBanner(args.latency_ms, args.jitter_ms, args.error_rate,
+                        subjects=args.subjects, sections_per_subject=args.sections).start()
+    postgrest = FakePostgrest(args.supabase_latency_ms).start()
+
+    os.environ['MTSAC_BASE_URL'] = banner.base_url
+    os.environ['SUPABASE_URL'] = postgrest.url
+    os.environ['SUPABASE_SERVICE_KEY'] = BENCH_SERVICE_KEY
+
+    print("🧪 Offline benchmark")
+    print(f"   Fake Banner: {banner.base_url} (latency {args.latency_ms}ms, error rate {args.error_rate})")
+    print(f"   Fake Supabase: {postgrest.url}")
+
+    results = []
+    try:
+        for name in args.scenario or sorted(SCENARIOS):
+            results.append(run_scenario(name, banner, postgrest))
+    finally:
+        banner.stop()
+        postgrest.stop()
+
+    for result in results:
+        print_result(result)
+
+    report = {
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'settings': {k: v for k, v in vars(args).items() if k not in ('json', 'baseline')},
+        'results': results,
+    }
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Results saved to {args.json}")
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print("\n❌ Regressions:")
+            for message in regressions:
+                print(f"   {message}")
+            sys.exit(1)
+        print("\n✅ No regressions against baseline")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# bench/startup.py
+"""
+Startup time of the commands cron and the scheduler run most often.
+
+Each command runs in a fresh interpreter, so this measures what a cron job
+pays before doing any work: interpreter start, imports and client setup.
+The dry-run upload uses a synthetic term file and a scratch mirror, so nothing
+touches the network.
+
+Usage (from backend/):
+    python -m bench.startup --repeat 10
+    python -m bench.startup --json startup.json
+    python -m bench.startup --baseline startup.json    # fail on a >25% slowdown
+    python -m bench.startup --importtime               # slowest imports of each command
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench.fixtures import SyntheticTerm
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def commands(courses_file):
+    """(name, argv) pairs to time; argv is passed to a fresh python"""
+    cli = os.path.join(BACKEND_DIR, 'cli.py')
+    return [
+        ('python', ['-c', 'pass']),
+        ('cli --help', [cli, '--help']),
+        ('cli scrape --help', [cli, 'scrape', '--help']),
+        ('import transform_course', ['-c', 'from orchestrator import transform_course']),
+        ('upload-file --dry-run', [cli, 'upload-file', courses_file, '--dry-run']),
+    ]
+
+def time_command(argv, env, cwd, repeat):
+    """Median and best wall time in ms of `python argv`, or (None, last error line) if it fails"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable] + argv, env=env, cwd=cwd, capture_output=True, text=True)
+        samples.append((time.perf_counter() - start) * 1000)
+        if result.returncode != 0:
+            return None, result.stderr.strip().splitlines()[-1]
+    return round(statistics.median(samples), 1), round(min(samples), 1)
+
+def slowest_imports(argv, env, cwd, count=8):
+    """Top-level packages with the largest cumulative import time (python -X importtime)"""
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + argv, env=env, cwd=cwd, capture_output=True, text=True)
+    totals = {}
+    for line in result.stderr.splitlines():
+        match = re.match(r'import time:\s+\d+ \|\s+(\d+) \| (\s*)(\S+)', line)
+        # Only modules imported directly by the command (no leading indent)
+        if match and not match.group(2):
+            totals[match.group(3)] = int(match.group(1)) / 1000
+    return sorted(totals.items(), key=lambda item: -item[1])[:count]
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure CLI startup time')
+    parser.add_argument('--repeat', type=int, default=10, help='Runs per command (default: 10)')
+    parser.add_argument('--importtime', action='store_true', help='Also list the slowest imports of each command')
+    parser.add_argument('--json', help='Save results to this file')
+    parser.add_argument('--baseline', help='Compare against a previous --json file')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed slowdown before failing (default: 0.25)')
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as scratch:
+        courses_file = os.path.join(scratch, 'courses.json')
+        with open(courses_file, 'w') as f:
+            json.dump([c for cs in SyntheticTerm('202640').courses_by_subject.values() for c in cs], f)
+
+        env = dict(os.environ, PYTHONPATH=BACKEND_DIR, SACTRACK_MIRROR_DB=os.path.join(scratch, 'mirror.sqlite'))
+        print(f"⏱️  Startup time ({args.repeat} runs each, median / best)")
+        for name, argv in commands(courses_file):
+            median, best = time_command(argv, env, scratch, args.repeat)
+            if median is None:
+                print(f"   {name:<24} ❌ {best}")
+                continue
+            results.append({'command': name, 'median_ms': median, 'best_ms': best})
+            print(f"   {name:<24} {median:7.1f} ms / {best:7.1f} ms")
+            if args.importtime and name != 'python':
+                for module, ms in slowest_imports(argv, env, scratch):
+                    print(f"      {module:<30} {ms:6.1f} ms")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'), 'results': results}, f, indent=2)
+        print(f"\n💾 Results saved to {args.json}")
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            previous = {r['command']: r for r in json.load(f).get('results', [])}
+        regressions = [
+            f"{r['command']}: {previous[r['command']]['median_ms']} → {r['median_ms']} ms"
+            for r in results
+            if r['command'] in previous and r['median_ms'] > previous[r['command']]['median_ms'] * (1 + args.threshold)
+        ]
+        if regressions:
+            print("\n❌ Regressions:")
+            for message in regressions:
+                print(f"   {message}")
+            sys.exit(1)
+        print("\n✅ No regressions against baseline")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+# catalog.py
+"""
+Course catalog: the text every section of a course shares.
+
+The title, description and prerequisites used to be copied onto every section
+row, so a course with 40 sections uploaded the same description 40 times per
+run. They now live in course_catalog, one row per (term, subject,
+course_number), and the sections table holds only per-section columns. The
+courses view joins the two back together for readers that want the old shape
+(see add_course_catalog.sql).
+
+A local copy of the catalog is kept in the mirror database with a hash of each
+row. A run upserts only the catalog rows whose content changed, and only
+remembers them once Supabase has them. The local copy also records when each
+course's description was last fetched, so descriptions fetched within
+CATALOG_MAX_AGE_DAYS are reused instead of fetched again.
+
+Usage:
+    python catalog.py --term 202640     # local copy of the catalog for a term
+"""
+import hashlib
+import json
+import os
+import time
+
+from config import chunks
+from descriptions import course_key, group_by_course
+from mirror import DEFAULT_PATH, connect
+
+CATALOG_COLUMNS = ['term', 'subject', 'course_number', 'title', 'course_description', 'prerequisites', 'prerequisite_type']
+
+# Stored once per course instead of on every section
+CATALOG_FIELDS = frozenset({'title', 'course_description', 'prerequisites', 'prerequisite_type'})
+
+# Catalog text rarely changes within a term; set to 0 to fetch every description every run
+CATALOG_MAX_AGE_DAYS = float(os.environ.get("SACTRACK_CATALOG_MAX_AGE_DAYS", "7"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS catalog (
+    term TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    course_number TEXT NOT NULL,
+    title TEXT,
+    course_description TEXT,
+    prerequisites TEXT,
+    prerequisite_type TEXT,
+    row_hash TEXT NOT NULL,
+    fetched_at REAL,
+    PRIMARY KEY (term, subject, course_number)
+);
+"""
+
+def row_hash(row):
+    return hashlib.sha1(json.dumps([row.get(column) for column in CATALOG_COLUMNS], default=str).encode()).hexdigest()
+
+def section_row(row):
+    """A transformed row without the columns that live in the catalog"""
+    return {column: value for column, value in row.items() if column not in CATALOG_FIELDS}
+
+def catalog_row(sections, term_code):
+    """The catalog row for one course, from its first section. Columns the sections lack are left out."""
+    first = sections[0]
+    term, subject, course_number = course_key(first, term_code)
+    row = {'term': term, 'subject': subject, 'course_number': course_number}
+    for column in CATALOG_FIELDS:
+        if column in first:
+            row[column] = first[column]
+    return row
+
+class Catalog:
+    """Local copy of course_catalog, stored next to the mirror"""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        with connect(path, SCHEMA):
+            pass
+
+    def connect(self):
+        return connect(self.path)
+
+    def load(self, term_code):
+        """Stored catalog rows for a term, keyed by (term, subject, course_number)"""
+        with self.connect() as conn:
+            rows = conn.execute("SELECT * FROM catalog WHERE term = ?", (term_code,)).fetchall()
+        return {(row['term'], row['subject'], row['course_number']): dict(row) for row in rows}
+
+    def fresh_descriptions(self, stored, max_age_days=CATALOG_MAX_AGE_DAYS):
+        """
+        Descriptions fetched within `max_age_days`, keyed like group_by_course,
+        in the shape fetch_course_description returns. Only a successful fetch
+        sets fetched_at; courses whose fetch failed are never fresh.
+        """
+        if max_age_days <= 0:
+            return {}
+        cutoff = time.time() - max_age_days * 86400
+        return {
+            key: {
+                'description': row['course_description'],
+                'prerequisites': row['prerequisites'],
+                'prerequisite_type': row['prerequisite_type'],
+            }
+            for key, row in stored.items()
+            if row['fetched_at'] is not None and row['fetched_at'] >= cutoff
+        }
+
+    def changed_rows(self, stored, transformed, term_code):
+        """
+        Catalog rows that differ from the stored ones. Columns the sections lack
+        (descriptions in a seats-only run) keep their stored values.
+        """
+        changed = []
+        for key, sections in group_by_course(transformed, term_code).items():
+            before = stored.get(key)
+            row = catalog_row(sections, term_code)
+            merged = {**{column: before[column] for column in CATALOG_COLUMNS}, **row} if before else row
+            if before is None or row_hash(merged) != before['row_hash']:
+                changed.append(merged)
+        return changed
+
+    def save(self, stored, rows, fetched=()):
+        """
+        Remember rows Supabase now has. `fetched` are the keys whose descriptions
+        were fetched this run; the others keep their previous fetch time.
+        """
+        now = time.time()
+        records = []
+        for row in rows:
+            key = (row['term'], row['subject'], row['course_number'])
+            before = stored.get(key)
+            fetched_at = now if key in fetched else (before['fetched_at'] if before else None)
+            records.append([row.get(column) for column in CATALOG_COLUMNS] + [row_hash(row), fetched_at])
+        with self.connect() as conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO catalog ({', '.join(CATALOG_COLUMNS)}, row_hash, fetched_at) "
+                f"VALUES ({', '.join('?' * len(CATALOG_COLUMNS))}, ?, ?)",
+                records
+            )
+
+    def mark_fetched(self, keys):
+        """Record a fetch for courses whose description came back unchanged"""
+        now = time.time()
+        with self.connect() as conn:
+            conn.executemany(
+                "UPDATE catalog SET fetched_at = ? WHERE term = ? AND subject = ? AND course_number = ?",
+                [(now, *key) for key in keys]
+            )
+
+def sync_catalog(client, catalog, term_code, stored, changed, fetched=()):
+    """
+    Upsert the changed catalog rows of a term. Returns the number of rows uploaded.
+    Rows in a failed batch aren't remembered, so they are sent again next run.
+    """
+    # Rows without descriptions (new courses in a seats-only run) go in their own
+    # batches, so the upsert leaves the stored text alone instead of clearing it
+    by_columns = {}
+    for row in changed:
+        by_columns.setdefault(tuple(sorted(row)), []).append(row)
+
+    uploaded = []
+    for rows in by_columns.values():
+        for batch in chunks(rows):
+            try:
+                client.table('course_catalog').upsert(batch).execute()
+                uploaded.extend(batch)
+            except Exception as e:
+                print(f"    ✗ Error uploading catalog batch: {e}")
+
+    # Only remember the new rows once Supabase has them
+    catalog.save(stored, uploaded, fetched)
+    changed_keys = {(row['term'], row['subject'], row['course_number']) for row in changed}
+    catalog.mark_fetched([key for key in fetched if key not in changed_keys and key in stored])
+    print(f"  📚 Catalog: {len(uploaded)} course{'s' if len(uploaded) != 1 else ''} updated")
+    return len(uploaded)
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Show the course catalog kept next to the mirror')
+    parser.add_argument('--term', required=True, help='Term code (e.g., 202640)')
+    parser.add_argument('--db', default=DEFAULT_PATH, help=f'Mirror database (default: {DEFAULT_PATH})')
+    args = parser.parse_args()
+
+    stored = Catalog(args.db).load(args.term)
+    fresh = Catalog(args.db).fresh_descriptions(stored)
+    for key, row in sorted(stored.items()):
+        state = 'fresh' if key in fresh else 'stale'
+        print(f"{row['subject']:<6} {row['course_number']:<8} {state:<6} {row['title'] or ''}")
+    print(f"\n{len(stored)} courses, {len(fresh)} with descriptions fetched in the last {CATALOG_MAX_AGE_DAYS:g} days")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+# changefeed.py
+"""
+Change feed of section updates, so frontends can follow seat counts without
+polling Supabase.
+
+Each run compares what it scraped with the local mirror (mirror.py) and
+appends one entry per added, changed or removed section to a change log in
+the mirror database. Every entry gets a version from a monotonically
+increasing counter. Changed sections carry only the fields that differ.
+
+The feed server keeps the newest entries in memory and streams them over
+Server-Sent Events. Clients subscribe by term and optionally subject, and
+resume from the last version they saw:
+
+    GET /changes?term=202640&subject=MATH,CSCI&since=1234     (text/event-stream)
+    GET /changes.json?term=202640&since=1234                  (one batch, for polling)
+
+In the browser, EventSource reconnects with Last-Event-ID on its own:
+
+    const feed = new EventSource(`${FEED_URL}/changes?term=202640&subject=MATH`);
+    feed.onmessage = (e) => applyChange(JSON.parse(e.data));
+    feed.addEventListener('reset', () => refetchEverything());
+
+A `reset` event means the requested version is no longer in the log (older
+than RETENTION_DAYS), so the client should reload the term and continue from
+the version in the event.
+
+Usage:
+    python changefeed.py --port 8765
+"""
+import json
+import sqlite3
+import threading
+import time
+from collections import deque
+from urllib.parse import parse_qs, urlparse
+
+from httpserve import QuietHandler, serve_in_background
+from mirror import COURSE_COLUMNS, DEFAULT_PATH, connect
+
+RETENTION_DAYS = 7
+BUFFER_SIZE = 20000
+POLL_SECONDS = 1.0
+HEARTBEAT_SECONDS = 15
+PAGE_SIZE = 1000
+
+# updated_at changes on every run, so it isn't part of a diff
+FEED_FIELDS = [column for column in COURSE_COLUMNS if column not in ('crn', 'term', 'updated_at')]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS changes (
+    version INTEGER PRIMARY KEY AUTOINCREMENT,
+    term TEXT NOT NULL,
+    subject TEXT,
+    crn TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    fields TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_changes_term ON changes(term, subject, version);
+CREATE INDEX IF NOT EXISTS idx_changes_created ON changes(created_at);
+"""
+
+def diff_rows(previous, rows, scraped=None, detect_removed=True, incomplete=()):
+    """
+    Changes between mirrored rows (keyed by CRN) and freshly uploaded rows.
+    Sections missing from `scraped` (default: `rows`) count as removed, but only
+    in subjects that were scraped completely: subjects in `incomplete` (failed,
+    truncated or with courses that didn't transform) never lose sections. With
+    `detect_removed` off (uploads from a file), nothing counts as removed.
+    """
+    changes = []
+    for row in rows:
+        before = previous.get(row['crn'])
+        if before is None:
+            fields = {k: row[k] for k in FEED_FIELDS if k in row}
+            changes.append({'crn': row['crn'], 'subject': row.get('subject'), 'kind': 'added', 'fields': fields})
+            continue
+        # Columns missing from the row (seats-only runs) are unchanged
+        fields = {k: row[k] for k in FEED_FIELDS if k in row and row[k] != before.get(k)}
+        if fields:
+            changes.append({'crn': row['crn'], 'subject': row.get('subject'), 'kind': 'changed', 'fields': fields})
+
+    if not detect_removed:
+        return changes
+    scraped = rows if scraped is None else scraped
+    current = {row['crn'] for row in scraped}
+    subjects = {row.get('subject') for row in scraped}
+    for crn, before in previous.items():
+        if crn not in current and before.get('subject') in subjects and before.get('subject') not in incomplete:
+            changes.append({'crn': crn, 'subject': before.get('subject'), 'kind': 'removed', 'fields': None})
+    return changes
+
+def entry_from_row(row):
+    return {
+        'version': row['version'],
+        'term': row['term'],
+        'subject': row['subject'],
+        'crn': row['crn'],
+        'kind': row['kind'],
+        'fields': json.loads(row['fields']) if row['fields'] else None,
+    }
+
+def matches(entry, term_code=None, subjects=None):
+    return (term_code is None or entry['term'] == term_code) and (not subjects or entry['subject'] in subjects)
+
+class ChangeLog:
+    """Versioned log of section changes, stored next to the mirror"""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        with connect(path, SCHEMA):
+            pass
+
+    def connect(self):
+        return connect(self.path)
+
+    def publish(self, term_code, changes):
+        """Append a run's changes; returns the latest version"""
+        now = time.time()
+        with self.connect() as conn:
+            conn.executemany(
+                "INSERT INTO changes (term, subject, crn, kind, fields, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (term_code, change['subject'], change['crn'], change['kind'],
+                     json.dumps(change['fields'], default=str) if change['fields'] is not None else None, now)
+                    for change in changes
+                ]
+            )
+            conn.execute("DELETE FROM changes WHERE created_at < ?", (now - RETENTION_DAYS * 86400,))
+            return conn.execute("SELECT MAX(version) FROM changes").fetchone()[0] or 0
+
+    def since(self, version, term_code=None, subjects=None, limit=PAGE_SIZE):
+        """Entries after `version`, oldest first"""
+        query = "SELECT * FROM changes WHERE version > ?"
+        params = [version]
+        if term_code:
+            query += " AND term = ?"
+            params.append(term_code)
+        if subjects:
+            query += f" AND subject IN ({', '.join('?' for _ in subjects)})"
+            params.extend(subjects)
+        query += " ORDER BY version LIMIT ?"
+        params.append(limit)
+        with self.connect() as conn:
+            return [entry_from_row(row) for row in conn.execute(query, params).fetchall()]
+
+    def version_range(self):
+        """(oldest, latest) version still in the log; (latest + 1, latest) when it is empty"""
+        with self.connect() as conn:
+            oldest, latest = conn.execute("SELECT MIN(version), MAX(version) FROM changes").fetchone()
+        # AUTOINCREMENT never reuses versions, so an emptied log still continues from its last version
+        if latest is None:
+            with self.connect() as conn:
+                row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'changes'").fetchone()
+            latest = row['seq'] if row else 0
+            return latest + 1, latest
+        return oldest, latest
+
+class ChangeFeed:
+    """In-process tail of the change log that streaming clients wait on"""
+
+    def __init__(self, log, buffer_size=BUFFER_SIZE, poll_seconds=POLL_SECONDS):
+        self.log = log
+        self.poll_seconds = poll_seconds
+        self.entries = deque(maxlen=buffer_size)
+        self.version = log.version_range()[1]
+        self.condition = threading.Condition()
+        self.stop_event = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._poll, daemon=True).start()
+        return self
+
+    def _poll(self):
+        # One reader for all clients, however many are connected
+        while not self.stop_event.wait(self.poll_seconds):
+            try:
+                new = self.log.since(self.version, limit=PAGE_SIZE)
+            except sqlite3.Error:
+                continue
+            if new:
+                with self.condition:
+                    self.entries.extend(new)
+                    self.version = new[-1]['version']
+                    self.condition.notify_all()
+
+    def read(self, since, term_code=None, subjects=None, timeout=HEARTBEAT_SECONDS):
+        """
+        (matching entries after `since`, version to resume from). Waits up to
+        `timeout` for something new; clients further behind than the memory
+        buffer are served from the database a page at a time.
+        """
+        with self.condition:
+            if since >= self.version:
+                self.condition.wait(timeout)
+            if since >= self.version:
+                return [], since
+            if self.entries and since >= self.entries[0]['version'] - 1:
+                return [e for e in self.entries if e['version'] > since and matches(e, term_code, subjects)], self.version
+
+        page = self.log.since(since, limit=PAGE_SIZE)
+        if not page:
+            return [], since
+        return [e for e in page if matches(e, term_code, subjects)], page[-1]['version']
+
+class ChangeFeedHandler(QuietHandler):
+    """Serves /changes (Server-Sent Events) and /changes.json"""
+
+    feed = None
+    allow_origin = '*'
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        term_code = params.get('term', [None])[0]
+        subjects = {s for value in params.get('subject', []) for s in value.upper().split(',') if s}
+        since = params.get('since', [None])[0] or self.headers.get('Last-Event-ID')
+
+        if url.path == '/changes':
+            self._stream(term_code, subjects, since)
+        elif url.path == '/changes.json':
+            self._batch(term_code, subjects, since)
+        else:
+            self._send(404, 'text/plain', 'not found\n')
+
+    def _start_version(self, since):
+        """(version to continue after, whether the client must reload first)"""
+        oldest, latest = self.feed.log.version_range()
+        if since is None:
+            return latest, False
+        try:
+            since = int(since)
+        except ValueError:
+            return latest, True
+        if since > latest or since < oldest - 1:
+            return latest, True
+        return since, False
+
+    def _batch(self, term_code, subjects, since):
+        version, reset = self._start_version(since)
+        entries = [] if reset else self.feed.log.since(version, term_code, subjects)
+        if entries:
+            version = entries[-1]['version']
+        body = json.dumps({'version': version, 'reset': reset, 'changes': entries})
+        self._send(200, 'application/json', body)
+
+    def _stream(self, term_code, subjects, since):
+        version, reset = self._start_version(since)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Access-Control-Allow-Origin', self.allow_origin)
+        self.end_headers()
+        try:
+            self._write("retry: 3000\n\n")
+            if reset:
+                self._write(f"event: reset\nid: {version}\ndata: {json.dumps({'version': version})}\n\n")
+            while not self.feed.stop_event.is_set():
+                entries, version = self.feed.read(version, term_code, subjects)
+                if not entries:
+                    self._write(": keepalive\n\n")
+                for entry in entries:
+                    self._write(f"id: {entry['version']}\ndata: {json.dumps(entry)}\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _write(self, text):
+        self.wfile.write(text.encode())
+        self.wfile.flush()
+
+def start_feed_server(port, path=DEFAULT_PATH):
+    """Serve the change feed on the given port from background threads"""
+    ChangeFeedHandler.feed = ChangeFeed(ChangeLog(path)).start()
+    return serve_in_background(port, ChangeFeedHandler)
+
+def serve(port, path=DEFAULT_PATH):
+    """Run the feed server until interrupted"""
+    start_feed_server(port, path)
+    print(f"📡 Change feed at http://localhost:{port}/changes?term=<term>&subject=<subject>")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Stream section changes to clients over Server-Sent Events')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on (default: 8765)')
+    parser.add_argument('--db', default=DEFAULT_PATH, help=f'Mirror database holding the change log (default: {DEFAULT_PATH})')
+    args = parser.parse_args()
+
+    serve(args.port, args.db)
+
+if __name__ == "__main__":
+    main()
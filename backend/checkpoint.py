@@ -0,0 +1,121 @@
+# checkpoint.py
+"""
+Resumable checkpoints for long scrape runs.
+
+Every completed subject search and course description fetch is appended to a
+per-term journal in checkpoints/, so a killed run picks up where it stopped
+instead of redoing hours of requests. The journal is removed once the term has
+been scraped and uploaded without errors.
+
+Only a killed run is resumed. A run that finishes with failed subjects or
+failed upload batches rewrites its journal as a "completed" marker listing
+what failed, without the scraped seat data. The next run then searches every
+subject again instead of reusing seat counts from an earlier run.
+"""
+import json
+import os
+import threading
+import time
+
+CHECKPOINT_DIR = "checkpoints"
+
+# Seat counts go stale quickly, so don't resume from very old runs
+MAX_AGE_HOURS = 12
+
+class Checkpoint:
+    """Append-only journal of finished work for one term"""
+
+    def __init__(self, term_code, directory=CHECKPOINT_DIR, resume=True):
+        self.term_code = term_code
+        self.path = os.path.join(directory, f"{term_code}.jsonl")
+        # Subjects restored from the journal, until the scraper takes them
+        self.subjects = {}
+        self.descriptions = {}
+        self.previous_failures = []
+        self.lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        if resume and os.path.exists(self.path):
+            self._load()
+        else:
+            self._start()
+
+    def _start(self):
+        with open(self.path, 'w') as f:
+            f.write(json.dumps({'type': 'header', 'term': self.term_code, 'started_at': time.time()}) + '\n')
+
+    def _load(self):
+        with open(self.path, 'r') as f:
+            lines = f.readlines()
+
+        try:
+            header = json.loads(lines[0])
+        except (IndexError, ValueError):
+            header = {}
+        age_hours = (time.time() - header.get('started_at', 0)) / 3600
+        if header.get('type') != 'header' or age_hours > MAX_AGE_HOURS:
+            print(f"  ⚠️  Discarding stale checkpoint for term {self.term_code}")
+            self._start()
+            return
+
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # Last line may be cut off if the process was killed mid-write
+                continue
+            if entry['type'] == 'completed':
+                # The previous run finished; its seat counts are not resumed
+                self.subjects, self.descriptions = {}, {}
+                self.previous_failures = entry.get('failed_subjects', [])
+                if self.previous_failures:
+                    print(f"  ↩️  Last run of term {self.term_code} finished with failed subjects: "
+                          f"{', '.join(self.previous_failures)} (searching everything again)")
+                self._start()
+                return
+            if entry['type'] == 'subject':
+                self.subjects[entry['code']] = entry['courses']
+            elif entry['type'] == 'description':
+                self.descriptions[entry['crn']] = entry['info']
+
+        if self.subjects or self.descriptions:
+            print(f"  ↩️  Resuming term {self.term_code} from checkpoint "
+                  f"({len(self.subjects)} subjects, {len(self.descriptions)} descriptions already done)")
+
+    def _append(self, entry):
+        line = json.dumps(entry) + '\n'
+        with self.lock:
+            with open(self.path, 'a') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def add_subject(self, code, courses):
+        # Only journaled: the caller already holds these courses, and keeping a
+        # second reference here would stop them being freed once transformed
+        self._append({'type': 'subject', 'code': code, 'courses': courses})
+
+    def add_description(self, crn, info):
+        self.descriptions[crn] = info
+        self._append({'type': 'description', 'crn': crn, 'info': info})
+
+    def finish(self, failed_subjects=()):
+        """
+        Mark the term finished after a run with errors. The journal keeps only
+        what failed, so the next run starts fresh instead of resuming.
+        """
+        lines = [
+            {'type': 'header', 'term': self.term_code, 'started_at': time.time()},
+            {'type': 'completed', 'finished_at': time.time(), 'failed_subjects': sorted(failed_subjects)},
+        ]
+        tmp = f"{self.path}.tmp"
+        with self.lock:
+            with open(tmp, 'w') as f:
+                f.writelines(json.dumps(line) + '\n' for line in lines)
+            os.replace(tmp, self.path)
+        self.subjects, self.descriptions = {}, {}
+
+    def clear(self):
+        with self.lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
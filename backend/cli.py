@@ -0,0 +1,118 @@
+# cli.py
+"""
+Single entry point for everything the backend runs.
+
+Modules are imported inside each subcommand and the Supabase client is only
+created when something is uploaded (config.get_supabase), so `--help`, dry
+runs and cron invocations don't pay for imports they never use. Startup time
+is tracked by bench/startup.py.
+
+Usage:
+    python cli.py scrape --update-only 202640
+    python cli.py scrape --all-future --years 2 --dry-run
+    python cli.py seats --update-only 202640
+    python cli.py upload-file mtsac_202640.json --dry-run
+    python cli.py service --metrics-port 9108 --feed-port 8765
+    python cli.py feed --port 8765
+"""
+import argparse
+import sys
+
+def add_scrape_arguments(parser, seats_only_flag=True):
+    parser.add_argument('--terms', nargs='+', help='Specific term codes to process (e.g., 202540 202630)')
+    parser.add_argument('--all-future', action='store_true', help='Process all future terms')
+    parser.add_argument('--years', type=int, default=2, help='Number of years ahead to process (default: 2)')
+    parser.add_argument('--save-json', action='store_true', help='Save scraped data to JSON files')
+    parser.add_argument('--update-only', help='Update only this specific term code')
+    parser.add_argument('--fresh', action='store_true', help='Ignore checkpoints from interrupted runs and start over')
+    if seats_only_flag:
+        parser.add_argument('--seats-only', action='store_true', help='Skip description/prerequisite fetching (quick seat count refresh)')
+    parser.add_argument('--dry-run', action='store_true', help='Scrape and transform but write nothing to Supabase')
+    parser.add_argument('--snapshots', action='store_true', help='Record hourly snapshots of the subject rollups (used during registration)')
+    parser.add_argument('--metrics-report', help='Write a JSON run report here (plus a Prometheus .prom file next to it)')
+    parser.add_argument('--profile', help='Profile each stage: cprofile, tracemalloc or cprofile,tracemalloc')
+    parser.add_argument('--distributed', action='store_true', help='Hand scraping to workers through the shared work queue')
+    parser.add_argument('--queue-db', help='Work queue database (default: queue/workqueue.sqlite)')
+    parser.add_argument('--local-workers', type=int, default=0, help='Worker threads to run in this process with --distributed')
+    parser.add_argument('--rate', type=float, default=5.0, help='Global Banner requests per second with --distributed (default: 5)')
+    parser.add_argument('--run-id', help='Work queue run ID; reuse one to resume an interrupted distributed run')
+
+def scrape_parser():
+    """Parser for `python orchestrator.py`, which takes the scrape arguments directly"""
+    parser = argparse.ArgumentParser(description='Scrape and upload Mt. SAC courses to Supabase')
+    add_scrape_arguments(parser)
+    return parser
+
+def scrape(args):
+    from orchestrator import run
+    run(args)
+    return 0
+
+def seats(args):
+    from orchestrator import run
+    args.seats_only = True
+    run(args)
+    return 0
+
+def upload_file(args):
+    from orchestrator import upload_from_file
+    success, errors = upload_from_file(args.file, term_code=args.term, dry_run=args.dry_run)
+    print(f"\n{'='*50}")
+    print(f"✅ DONE!")
+    print(f"   {'Would upload' if args.dry_run else 'Successfully uploaded'}: {success} courses")
+    if errors > 0:
+        print(f"   ❌ Errors: {errors} courses")
+    print(f"{'='*50}")
+    return 1 if errors else 0
+
+def service(args):
+    import scheduler
+    if args.once:
+        return 0 if scheduler.run_update(years_ahead=args.years) else 1
+    scheduler.run_as_service(years_ahead=args.years, metrics_port=args.metrics_port, feed_port=args.feed_port)
+    return 0
+
+def feed(args):
+    from changefeed import DEFAULT_PATH, serve
+    serve(args.port, args.db or DEFAULT_PATH)
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Mt. SAC course scraper and Supabase updater')
+    subparsers = parser.add_subparsers(dest='command', metavar='command')
+    subparsers.required = True
+
+    scrape_command = subparsers.add_parser('scrape', help='Scrape terms from Banner and upload them')
+    add_scrape_arguments(scrape_command)
+    scrape_command.set_defaults(handler=scrape)
+
+    seats_command = subparsers.add_parser('seats', help='Quick seat count refresh (no descriptions/prerequisites)')
+    add_scrape_arguments(seats_command, seats_only_flag=False)
+    seats_command.set_defaults(handler=seats)
+
+    upload_command = subparsers.add_parser('upload-file', help='Upload courses from a saved JSON file without scraping')
+    upload_command.add_argument('file', help='JSON file of Banner search results (e.g., from --save-json)')
+    upload_command.add_argument('--term', help='Upload every course under this term code instead of its own')
+    upload_command.add_argument('--dry-run', action='store_true', help='Transform and diff only, write nothing to Supabase')
+    upload_command.set_defaults(handler=upload_file)
+
+    service_command = subparsers.add_parser('service', help='Run the scheduler (dynamic academic period-based updates)')
+    service_command.add_argument('--once', action='store_true', help='Run one update and exit')
+    service_command.add_argument('--years', type=int, default=2, help='Number of years ahead to process (default: 2)')
+    service_command.add_argument('--metrics-port', type=int, help='Serve Prometheus metrics on this port')
+    service_command.add_argument('--feed-port', type=int, help='Stream section changes on this port')
+    service_command.set_defaults(handler=service)
+
+    feed_command = subparsers.add_parser('feed', help='Stream section changes to clients (Server-Sent Events)')
+    feed_command.add_argument('--port', type=int, default=8765, help='Port to listen on (default: 8765)')
+    feed_command.add_argument('--db', help='Mirror database holding the change log (default: data/mirror.sqlite)')
+    feed_command.set_defaults(handler=feed)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+# config.py
+"""
+Settings shared by the scraper and the uploader.
+Environment variables override the defaults, which lets the same code run
+against the local fixture servers in bench/.
+"""
+import os
+
+BASE_URL = os.environ.get("MTSAC_BASE_URL", "https://prodrg.mtsac.edu/StudentRegistrationSsb/ssb")
+
+# Rows per Supabase request
+BATCH_SIZE = 100
+
+def supabase_credentials():
+    """Supabase URL and service key from the environment, falling back to secrets.py"""
+    url = os.environ.get("SUPABASE_URL")
+    key = os.environ.get("SUPABASE_SERVICE_KEY")
+    if url and key:
+        return url, key
+    
+    from secrets import SUPABASE_URL, SUPABASE_SERVICE_KEY
+    return url or SUPABASE_URL, key or SUPABASE_SERVICE_KEY
+
+_supabase = None
+
+def get_supabase():
+    """Shared Supabase client, created on first use so imports and --help stay fast"""
+    global _supabase
+    if _supabase is None:
+        from supabase import create_client
+        _supabase = create_client(*supabase_credentials())
+    return _supabase
+
+def chunks(items, size=BATCH_SIZE):
+    """Split rows (or any iterable) into lists of at most `size` for batched requests"""
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
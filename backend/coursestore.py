@@ -0,0 +1,117 @@
+# coursestore.py
+"""
+Compact in-memory container for transformed course rows.
+
+A plain dict per section costs over a kilobyte before its values, and every
+section carries its own copy of strings like the subject, campus, schedule
+type, instructor name and catalog text. CourseStore keeps each section as a
+__slots__ record and dictionary-encodes every column except the CRN, so equal
+values are stored once per store.
+
+Records behave like the dicts they replace (row['crn'], row.get(...),
+'key' in row, del row[...], {**row}), so the transform, description, diff and
+upload stages use them unchanged. Columns that were deleted (e.g. descriptions
+in a seats-only run) are simply missing, as they were from the dicts.
+"""
+from mirror import COURSE_COLUMNS
+
+COLUMN_SET = frozenset(COURSE_COLUMNS)
+
+# Unique per section, so there is nothing to share
+UNPOOLED_COLUMNS = frozenset({'crn'})
+
+class CourseRecord:
+    """One section; a dict-like view over __slots__"""
+
+    __slots__ = tuple(COURSE_COLUMNS)
+
+    def __getitem__(self, key):
+        if key not in COLUMN_SET:
+            raise KeyError(key)
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        if key not in COLUMN_SET:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __delitem__(self, key):
+        if key not in COLUMN_SET or not hasattr(self, key):
+            raise KeyError(key)
+        delattr(self, key)
+
+    def __contains__(self, key):
+        return key in COLUMN_SET and hasattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in COLUMN_SET else default
+
+    def keys(self):
+        return [column for column in COURSE_COLUMNS if hasattr(self, column)]
+
+    def items(self):
+        return [(column, getattr(self, column)) for column in self.keys()]
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"CourseRecord({self.to_dict()!r})"
+
+class CourseStore:
+    """Sections of one term as compact records with shared column values"""
+
+    def __init__(self, rows=()):
+        self.records = []
+        self.pools = {column: {} for column in COURSE_COLUMNS if column not in UNPOOLED_COLUMNS}
+        for row in rows:
+            self.append(row)
+
+    def append(self, row):
+        """Add a transformed row (dict); returns its record"""
+        record = CourseRecord()
+        for column, value in row.items():
+            pool = self.pools.get(column)
+            if pool is not None and value is not None:
+                try:
+                    # Keyed by type too, so 3 and 3.0 (or 1 and True) stay distinct
+                    value = pool.setdefault((type(value), value), value)
+                except TypeError:
+                    pass  # unhashable, keep as is
+            setattr(record, column, value)
+        self.records.append(record)
+        return record
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    def __bool__(self):
+        return bool(self.records)
+
+    def drop_columns(self, *columns):
+        """Remove columns from every record (e.g. to leave stored values alone on upload)"""
+        for record in self.records:
+            for column in columns:
+                if hasattr(record, column):
+                    delattr(record, column)
+        for column in columns:
+            self.pools.pop(column, None)
+
+    def batches(self, size):
+        """Records `size` at a time, for batched uploads"""
+        for i in range(0, len(self.records), size):
+            yield self.records[i:i + size]
+
+    def distinct(self, column):
+        """Number of distinct values stored for a column"""
+        pool = self.pools.get(column)
+        return len(pool) if pool is not None else len({record.get(column) for record in self.records})
@@ -0,0 +1,72 @@
+# descriptions.py
+"""
+Course description parsing.
+
+Banner's getCourseDescription returns HTML where the catalog text is
+HTML-escaped inside the page, e.g.
+    &lt;b&gt;Advisory:&lt;/b&gt;&lt;i&gt;MATH 71 or equivalent&lt;/i&gt;Course text...
+Patterns are compiled once at import, and the slow case-insensitive boilerplate
+pass only runs when a cheap substring check finds boilerplate. Every section of a
+course shares one description, so each distinct description is fetched and
+parsed once per run.
+"""
+import re
+
+PREREQ_PATTERN = re.compile(
+    r'&lt;b&gt;(Advisory|Prerequisite|Corequisite):?\s*&lt;/b&gt;&lt;i&gt;(.*?)&lt;/i&gt;',
+    re.IGNORECASE | re.DOTALL
+)
+
+# Escaped tags from the catalog text, then real tags from the page
+ESCAPED_TAG_PATTERN = re.compile(r'&lt;.*?&gt;')
+TAG_PATTERN = re.compile(r'<.*?>')
+
+# Boilerplate from the Banner page that isn't part of the description
+BOILERPLATE_PHRASES = ('display course description', 'if there is a section description', 'when there is no course')
+BOILERPLATE_PATTERN = re.compile(
+    r'(display course description|if there is a section description.*?|when there is no course.*?)',
+    re.IGNORECASE
+)
+
+EMPTY_VALUES = {'', 'None', 'N/A'}
+
+def parse_description_html(html):
+    """
+    Extract the description and prerequisites from a getCourseDescription response.
+    Returns a dictionary with 'description', 'prerequisites' and
+    'prerequisite_type' (Advisory, Prerequisite or Corequisite) keys.
+    """
+    prerequisites = None
+    prerequisite_type = None
+
+    prereq_match = PREREQ_PATTERN.search(html)
+    if prereq_match:
+        prerequisites = prereq_match.group(2).strip()
+        prerequisite_type = prereq_match.group(1).capitalize()
+        # Cut the prerequisite section out so it isn't repeated in the description
+        html = html[:prereq_match.start()] + html[prereq_match.end():]
+
+    text = ESCAPED_TAG_PATTERN.sub('', html)
+    text = TAG_PATTERN.sub('', text)
+    text = ' '.join(text.split())
+    
+    lowered = text.lower()
+    if any(phrase in lowered for phrase in BOILERPLATE_PHRASES):
+        text = BOILERPLATE_PATTERN.sub('', text).strip()
+
+    return {
+        'description': text if text not in EMPTY_VALUES else None,
+        'prerequisites': prerequisites,
+        'prerequisite_type': prerequisite_type
+    }
+
+def course_key(course_data, term_code=None):
+    """(term, subject, course_number) shared by every section of a course"""
+    return (course_data.get('term') or term_code, course_data.get('subject'), course_data.get('course_number'))
+
+def group_by_course(transformed, term_code=None):
+    """Group transformed sections by course so each description is fetched once"""
+    groups = {}
+    for course_data in transformed:
+        groups.setdefault(course_key(course_data, term_code), []).append(course_data)
+    return groups
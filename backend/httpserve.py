@@ -0,0 +1,41 @@
+# httpserve.py
+"""
+Small HTTP endpoints served from background threads: the scheduler's metrics
+server and the change feed.
+
+Usage:
+    class Handler(QuietHandler):
+        def do_GET(self):
+            self._send(200, 'text/plain', 'ok\n')
+
+    server = serve_in_background(9108, Handler)
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class QuietHandler(BaseHTTPRequestHandler):
+    """Request handler that doesn't log every request and answers with whole bodies"""
+
+    # Set to '*' to let browsers on other origins read the responses
+    allow_origin = None
+
+    def _send(self, status, content_type, body):
+        data = body.encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        if self.allow_origin:
+            self.send_header('Access-Control-Allow-Origin', self.allow_origin)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # Keep polling clients out of the logs
+        pass
+
+def serve_in_background(port, handler_class):
+    """Serve `handler_class` on all interfaces from daemon threads; returns the server"""
+    server = ThreadingHTTPServer(('0.0.0.0', port), handler_class)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
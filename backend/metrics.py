@@ -0,0 +1,310 @@
+# metrics.py
+"""
+In-process run metrics and opt-in profiling for the scraper pipeline.
+
+Counters, gauges and histograms are collected while the orchestrator runs and
+written at the end as a JSON run report plus a Prometheus text file next to it,
+which the scheduler serves on /metrics.
+
+Profiling is off by default. Set SACTRACK_PROFILE (or pass --profile to the
+orchestrator) to "cprofile", "tracemalloc" or "cprofile,tracemalloc" to profile
+each pipeline stage; results go to logs/profiles/.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+PROFILE_DIR = os.path.join("logs", "profiles")
+
+# Upper bounds in seconds for latency histograms
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+HELP = {
+    'http_requests_total': 'Requests sent to Banner, by endpoint and status',
+    'http_retries_total': 'Banner requests retried after a failure',
+    'http_request_duration_seconds': 'Banner request latency including the body download, by endpoint',
+    'stage_duration_seconds': 'Wall time of each pipeline stage',
+    'rows_transformed_total': 'Courses transformed to the database schema',
+    'descriptions_fetched_total': 'Course description pages requested from Banner',
+    'upsert_batch_duration_seconds': 'Supabase upsert latency per batch',
+    'rows_upserted_total': 'Rows sent to Supabase',
+    'rows_deleted_total': 'Sections deleted from Supabase because they are no longer offered',
+    'rows_changed_total': 'Rows that differ from the previous run',
+    'changes_published_total': 'Section changes appended to the change feed',
+    'queue_timeouts_total': 'Work queue stages that timed out waiting for workers',
+    'peak_rss_bytes': 'Peak resident memory during each term (Linux only)',
+    'process_peak_rss_bytes': 'Peak resident memory of the process since it started',
+    'stage_peak_traced_bytes': 'Peak memory traced by tracemalloc during a stage',
+}
+
+_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+_histograms = {}
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+def inc(name, value=1, **labels):
+    """Add to a counter"""
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+def set_gauge(name, value, **labels):
+    """Set a gauge to its current value"""
+    with _lock:
+        _gauges[_key(name, labels)] = value
+
+def observe(name, value, **labels):
+    """Record one observation in a histogram"""
+    key = _key(name, labels)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = {'count': 0, 'sum': 0.0, 'max': 0.0, 'buckets': [0] * len(DEFAULT_BUCKETS)}
+        hist['count'] += 1
+        hist['sum'] += value
+        hist['max'] = max(hist['max'], value)
+        for i, bound in enumerate(DEFAULT_BUCKETS):
+            if value <= bound:
+                hist['buckets'][i] += 1
+
+@contextmanager
+def timer(name, **labels):
+    """Time the wrapped block into a histogram"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+def counter_total(name, **labels):
+    """Sum of a counter over every label set that includes `labels`"""
+    wanted = set(labels.items())
+    with _lock:
+        return sum(v for (n, l), v in _counters.items() if n == name and wanted <= set(l))
+
+def gauge(name, **labels):
+    """Current value of a gauge, or None if it was never set"""
+    with _lock:
+        return _gauges.get(_key(name, labels))
+
+def histogram(name, **labels):
+    """Copy of a histogram's count/sum/max/buckets, or None if empty"""
+    with _lock:
+        hist = _histograms.get(_key(name, labels))
+        return dict(hist, buckets=list(hist['buckets'])) if hist else None
+
+# Highest peak seen before reset_peak_rss last cleared the kernel's high-water mark
+_earlier_peak_rss = 0
+
+def peak_rss_bytes():
+    """Peak resident memory of this process since it started, or None where unsupported"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    peak = peak if sys.platform == 'darwin' else peak * 1024
+    return max(peak, _earlier_peak_rss)
+
+def reset_peak_rss():
+    """
+    Start a new high-water mark for term_peak_rss_bytes. Only Linux can reset
+    it (through /proc/self/clear_refs); returns False where it can't.
+    Resetting also clears ru_maxrss, so the peak so far is kept for peak_rss_bytes.
+    """
+    global _earlier_peak_rss
+    _earlier_peak_rss = peak_rss_bytes() or 0
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def term_peak_rss_bytes():
+    """Peak resident memory since the last reset_peak_rss (Linux VmHWM), or None where unsupported"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _histograms.clear()
+
+def snapshot():
+    """All metrics as plain JSON-serializable data"""
+    def labelled(items):
+        return [{'name': name, 'labels': dict(labels), 'value': value} for (name, labels), value in sorted(items)]
+
+    with _lock:
+        return {
+            'counters': labelled(_counters.items()),
+            'gauges': labelled(_gauges.items()),
+            'histograms': labelled((k, dict(v)) for k, v in _histograms.items()),
+        }
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels, extra=None):
+    pairs = list(labels) + (extra or [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+def render_prometheus(prefix='sactrack_'):
+    """Render all metrics in the Prometheus text exposition format"""
+    lines = []
+    seen = set()
+
+    def header(name, kind):
+        if name not in seen:
+            seen.add(name)
+            if name in HELP:
+                lines.append(f"# HELP {prefix}{name} {HELP[name]}")
+            lines.append(f"# TYPE {prefix}{name} {kind}")
+
+    with _lock:
+        for (name, labels), value in sorted(_counters.items()):
+            header(name, 'counter')
+            lines.append(f"{prefix}{name}{_format_labels(labels)} {value}")
+        for (name, labels), value in sorted(_gauges.items()):
+            header(name, 'gauge')
+            lines.append(f"{prefix}{name}{_format_labels(labels)} {value}")
+        for (name, labels), hist in sorted(_histograms.items()):
+            header(name, 'histogram')
+            for bound, count in zip(DEFAULT_BUCKETS, hist['buckets']):
+                lines.append(f"{prefix}{name}_bucket{_format_labels(labels, [('le', bound)])} {count}")
+            lines.append(f"{prefix}{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {hist['count']}")
+            lines.append(f"{prefix}{name}_sum{_format_labels(labels)} {hist['sum']:.6f}")
+            lines.append(f"{prefix}{name}_count{_format_labels(labels)} {hist['count']}")
+
+    return '\n'.join(lines) + '\n'
+
+def _write_atomic(path, text):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+def write_report(path, summary=None):
+    """
+    Write the JSON run report to `path` and the Prometheus text version
+    next to it (same name with a .prom extension).
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    report = {
+        'generated_at': datetime.now().isoformat(),
+        'summary': summary or {},
+        'metrics': snapshot(),
+    }
+    _write_atomic(path, json.dumps(report, indent=2))
+    _write_atomic(os.path.splitext(path)[0] + '.prom', render_prometheus())
+
+def profile_modes():
+    """Profilers requested through SACTRACK_PROFILE"""
+    value = os.environ.get('SACTRACK_PROFILE', '')
+    return {mode.strip() for mode in value.split(',') if mode.strip()}
+
+class Stage:
+    """
+    Yielded by profile_stage. When another stage's work runs inside the block
+    (a search streamed into the transform downloads as it is iterated), that
+    time is counted toward the other stage instead.
+    """
+
+    def __init__(self):
+        self.moved = {}
+
+    def move(self, stage, seconds):
+        self.moved[stage] = self.moved.get(stage, 0.0) + seconds
+
+    def moved_seconds(self):
+        return sum(self.moved.values())
+
+    def iterate(self, items, stage):
+        """Yield from `items`, counting the time spent waiting for each one toward `stage`"""
+        items = iter(items)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(items)
+            except StopIteration:
+                return
+            finally:
+                self.move(stage, time.perf_counter() - start)
+            yield item
+
+@contextmanager
+def profile_stage(stage, term_code=None):
+    """
+    Time a pipeline stage and, if profiling is enabled, run it under
+    cProfile and/or tracemalloc. Profiles cover the whole block, including
+    time moved to another stage through the yielded Stage.
+    """
+    modes = profile_modes()
+    label = f"{term_code}_{stage}" if term_code else stage
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+    profiler = None
+    if 'cprofile' in modes:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    tracing = False
+    if 'tracemalloc' in modes:
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+            tracing = True
+
+    handle = Stage()
+    start = time.perf_counter()
+    try:
+        yield handle
+    finally:
+        labels = {'term': term_code} if term_code else {}
+        observe('stage_duration_seconds', time.perf_counter() - start - handle.moved_seconds(), stage=stage, **labels)
+        for other, seconds in handle.moved.items():
+            observe('stage_duration_seconds', seconds, stage=other, **labels)
+
+        if modes:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+
+        if profiler is not None:
+            profiler.disable()
+            prof_path = os.path.join(PROFILE_DIR, f"{label}_{stamp}.prof")
+            profiler.dump_stats(prof_path)
+            print(f"  🔬 cProfile for {stage} saved to {prof_path}")
+
+        if tracing:
+            import tracemalloc
+            _, peak = tracemalloc.get_traced_memory()
+            top = tracemalloc.take_snapshot().statistics('lineno')[:25]
+            tracemalloc.stop()
+            mem_path = os.path.join(PROFILE_DIR, f"{label}_{stamp}_memory.txt")
+            with open(mem_path, 'w') as f:
+                f.write(f"Peak traced memory: {peak / 1024 / 1024:.1f} MiB\n\n")
+                for stat in top:
+                    f.write(f"{stat}\n")
+            set_gauge('stage_peak_traced_bytes', peak, **labels)
+            print(f"  🔬 tracemalloc for {stage} saved to {mem_path}")
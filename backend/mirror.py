@@ -0,0 +1,220 @@
+# mirror.py
+"""
+Local embedded mirror of the courses table.
+
+Every run writes the rows it uploaded to Supabase into a local SQLite database,
+so reports and bulk exports (see reports.py) run locally without REST
+pagination or Supabase rate limits. Only rows whose content changed are
+rewritten, and the stored row hashes double as the change detection for
+uploads.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+DEFAULT_PATH = os.environ.get("SACTRACK_MIRROR_DB", os.path.join("data", "mirror.sqlite"))
+
+# Columns of the courses table, in the order transform_course builds them
+COURSE_COLUMNS = [
+    'crn', 'term', 'term_desc', 'subject', 'course_number', 'section', 'title',
+    'credits_low', 'credits_high', 'instructor_name', 'instructor_email',
+    'max_enrollment', 'current_enrollment', 'seats_available', 'waitlist_capacity',
+    'waitlist_count', 'open_section', 'schedule_type', 'instructional_method', 'campus',
+    'meeting_days', 'meeting_time_start', 'meeting_time_end', 'meeting_building',
+    'meeting_room', 'start_date', 'end_date', 'has_uc_credit_limitation',
+    'prerequisites', 'prerequisite_type', 'course_description', 'updated_at',
+]
+
+# Left out of rows whose descriptions weren't fetched (seats-only runs, failed fetches)
+TEXT_COLUMNS = ('prerequisites', 'prerequisite_type', 'course_description')
+SECTION_HASH_COLUMNS = [c for c in COURSE_COLUMNS if c not in TEXT_COLUMNS and c != 'updated_at']
+
+# SQLite allows 999 parameters per statement
+LOOKUP_BATCH = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS courses (
+    crn TEXT NOT NULL,
+    term TEXT NOT NULL,
+    term_desc TEXT,
+    subject TEXT,
+    course_number TEXT,
+    section TEXT,
+    title TEXT,
+    credits_low REAL,
+    credits_high REAL,
+    instructor_name TEXT,
+    instructor_email TEXT,
+    max_enrollment INTEGER,
+    current_enrollment INTEGER,
+    seats_available INTEGER,
+    waitlist_capacity INTEGER,
+    waitlist_count INTEGER,
+    open_section INTEGER,
+    schedule_type TEXT,
+    instructional_method TEXT,
+    campus TEXT,
+    meeting_days TEXT,
+    meeting_time_start TEXT,
+    meeting_time_end TEXT,
+    meeting_building TEXT,
+    meeting_room TEXT,
+    start_date TEXT,
+    end_date TEXT,
+    has_uc_credit_limitation INTEGER,
+    prerequisites TEXT,
+    prerequisite_type TEXT,
+    course_description TEXT,
+    updated_at TEXT,
+    row_hash TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (term, crn)
+);
+CREATE INDEX IF NOT EXISTS idx_mirror_term_subject ON courses(term, subject, course_number);
+CREATE INDEX IF NOT EXISTS idx_mirror_term_instructor ON courses(term, instructor_name);
+CREATE INDEX IF NOT EXISTS idx_mirror_term_open ON courses(term, open_section);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    term TEXT NOT NULL,
+    finished_at REAL NOT NULL,
+    rows_seen INTEGER NOT NULL,
+    rows_changed INTEGER NOT NULL,
+    errors INTEGER NOT NULL
+);
+"""
+
+@contextmanager
+def connect(path, schema=None):
+    """
+    Connection to a SQLite store in `path`, committed if the block succeeds.
+    With `schema`, the directory and tables are created first. The mirror,
+    change log, rollups and catalog all share this database.
+    """
+    if schema is not None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        if schema is not None:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(schema)
+        yield conn
+        conn.commit()
+    finally:
+        conn.close()
+
+def _digest(row, columns):
+    content = json.dumps({k: row.get(k) for k in columns}, sort_keys=True, default=str)
+    return hashlib.sha1(content.encode()).hexdigest()[:16]
+
+def row_hash(row):
+    """
+    Hash of a course row, ignoring updated_at: 16 hex digits for the section
+    columns followed by 16 for the catalog text, so a row without the text
+    columns can be compared on its first half alone.
+    """
+    return _digest(row, SECTION_HASH_COLUMNS) + _digest(row, TEXT_COLUMNS)
+
+def row_differs(row, stored_hash):
+    """Whether a row differs from the mirrored row with `stored_hash`. Missing text columns count as unchanged."""
+    if all(column in row for column in TEXT_COLUMNS):
+        return row_hash(row) != stored_hash
+    return _digest(row, SECTION_HASH_COLUMNS) != stored_hash[:16]
+
+class Mirror:
+    """SQLite copy of the uploaded course rows"""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        with connect(path, SCHEMA):
+            pass
+
+    def connect(self):
+        return connect(self.path)
+
+    def existing_rows(self, term_code):
+        """Mirrored rows for a term, keyed by CRN"""
+        with self.connect() as conn:
+            rows = conn.execute("SELECT * FROM courses WHERE term = ?", (term_code,)).fetchall()
+        return {row['crn']: dict(row) for row in rows}
+
+    def hashes(self, term_code):
+        """Row hashes of a term's mirrored sections, keyed by CRN; enough to find what changed"""
+        with self.connect() as conn:
+            return dict(conn.execute("SELECT crn, row_hash FROM courses WHERE term = ?", (term_code,)))
+
+    def rows(self, term_code, crns):
+        """Mirrored rows for just these CRNs, keyed by CRN"""
+        crns = list(crns)
+        found = {}
+        with self.connect() as conn:
+            for i in range(0, len(crns), LOOKUP_BATCH):
+                batch = crns[i:i + LOOKUP_BATCH]
+                rows = conn.execute(
+                    f"SELECT * FROM courses WHERE term = ? AND crn IN ({', '.join('?' * len(batch))})",
+                    [term_code, *batch]
+                ).fetchall()
+                found.update((row['crn'], dict(row)) for row in rows)
+        return found
+
+    def changed_rows(self, hashes, rows):
+        """
+        Rows that differ from what is mirrored, given the stored `hashes`. Columns
+        missing from a row (descriptions in a seats-only refresh) are unchanged.
+        """
+        return [row for row in rows if row['crn'] not in hashes or row_differs(row, hashes[row['crn']])]
+
+    def upsert(self, term_code, rows, previous=None):
+        """
+        Write uploaded rows, merging with what is already mirrored. `previous`
+        may hold the mirrored rows for these CRNs, if they were already loaded.
+        """
+        if not rows:
+            return
+        now = time.time()
+        placeholders = ', '.join('?' for _ in COURSE_COLUMNS)
+        if previous is None:
+            previous = self.rows(term_code, [row['crn'] for row in rows])
+
+        records = []
+        for row in rows:
+            before = previous.get(row['crn'])
+            merged = {**before, **row} if before else dict(row)
+            records.append(
+                [merged.get(column) for column in COURSE_COLUMNS]
+                + [row_hash(merged), before['first_seen'] if before else now, now]
+            )
+
+        with self.connect() as conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO courses ({', '.join(COURSE_COLUMNS)}, row_hash, first_seen, last_seen) "
+                f"VALUES ({placeholders}, ?, ?, ?)",
+                records
+            )
+
+    def touch(self, term_code, crns):
+        """Mark unchanged rows as seen in this run"""
+        now = time.time()
+        with self.connect() as conn:
+            conn.executemany(
+                "UPDATE courses SET last_seen = ? WHERE term = ? AND crn = ?",
+                [(now, term_code, crn) for crn in crns]
+            )
+
+    def remove(self, term_code, crns):
+        """Drop sections that are no longer offered"""
+        with self.connect() as conn:
+            conn.executemany("DELETE FROM courses WHERE term = ? AND crn = ?", [(term_code, crn) for crn in crns])
+
+    def record_run(self, term_code, rows_seen, rows_changed, errors):
+        with self.connect() as conn:
+            conn.execute(
+                "INSERT INTO runs (term, finished_at, rows_seen, rows_changed, errors) VALUES (?, ?, ?, ?, ?)",
+                (term_code, time.time(), rows_seen, rows_changed, errors)
+            )
@@ -4,22 +4,30 @@ Main orchestrator script that scrapes courses and uploads to Supabase.
 Supports multiple terms and automatic term detection.
 """
 import json
+import os
 import sys
-import requests
+import time
 from datetime import datetime
-from supabase import create_client
-from secrets import SUPABASE_URL, SUPABASE_SERVICE_KEY
-from scraper import scrape_all_courses, get_subjects
-
-# Create Supabase client
-supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+from config import BASE_URL, BATCH_SIZE, chunks, get_supabase, supabase_credentials
+from checkpoint import Checkpoint
+from descriptions import course_key, group_by_course
+from prereqs import sync_prereq_graph
+from mirror import Mirror
+from catalog import Catalog, section_row, sync_catalog
+from changefeed import ChangeLog, diff_rows
+from coursestore import CourseStore
+from rollups import sync_rollups
+from shards import export_term
+import metrics
 
 def get_available_terms():
     """
     Get list of available terms from Mt. SAC.
     Returns list of term dictionaries with code and description.
     """
-    base_url = "https://prodrg.mtsac.edu/StudentRegistrationSsb/ssb"
+    import requests
+    
+    base_url = BASE_URL
     try:
         session = requests.Session()
         session.get(f"{base_url}/term/termSelection?mode=search")
@@ -82,7 +90,7 @@ def generate_future_terms(years_ahead=2):
     terms.sort(key=lambda x: x['code'])
     return terms
 
-def transform_course(course, fetch_details=True):
+def transform_course(course, fetch_details=True, updated_at=None):
     """Transform course data to match database schema"""
     instructor_name = 'TBA'
     instructor_email = None
@@ -139,97 +147,372 @@ def transform_course(course, fetch_details=True):
         'end_date': meeting.get('endDate'),
         'has_uc_credit_limitation': has_uc_credit_limitation,
         'prerequisites': None,  # Will be filled in if fetch_details=True
+        'prerequisite_type': None,  # Advisory, Prerequisite or Corequisite
         'course_description': None,  # Will be filled in if fetch_details=True
-        'updated_at': datetime.now().isoformat()
+        'updated_at': updated_at or datetime.now().isoformat()
     }
     
     return transformed
 
-def upload_courses_to_supabase(courses, term_code, fetch_descriptions=True):
-    """Upload transformed courses to Supabase"""
-    if not courses:
-        print(f"  ⚠️  No courses to upload for term {term_code}")
-        return 0, 0
+def fetch_descriptions_for(transformed, term_code, checkpoint=None, queue=None, run_id=None, known=None):
+    """
+    Fill in course_description and prerequisites on transformed courses.
+    Every section of a course shares the same catalog text, so each
+    (term, subject, course_number) is fetched once and copied to its sections.
+    Descriptions already in `checkpoint`, or in `known` (recently fetched
+    catalog text keyed by course), are reused instead of fetched again.
+    With a work queue, the fetches are published as tasks for the workers.
+    Courses whose fetch failed are left without the description columns, as in a
+    seats-only run, so their stored text is kept instead of being cleared.
+    Returns the keys of the courses whose descriptions were fetched this run.
+    """
+    print(f"  📖 Fetching course descriptions and prerequisites...")
+    from scraper import fetch_course_description, setup_session
     
-    print(f"  🔄 Transforming {len(courses)} courses...")
-    transformed = []
-    transform_errors = 0
+    groups = group_by_course(transformed, term_code)
+    print(f"    {len(groups)} distinct courses across {len(transformed)} sections")
     
-    for course in courses:
-        try:
-            transformed.append(transform_course(course))
-        except Exception as e:
-            transform_errors += 1
-            print(f"    ⚠️  Error transforming course CRN {course.get('courseReferenceNumber', 'unknown')}: {e}")
+    def apply(sections, desc_info):
+        for course_data in sections:
+            course_data['course_description'] = desc_info.get('description')
+            course_data['prerequisites'] = desc_info.get('prerequisites')
+            course_data['prerequisite_type'] = desc_info.get('prerequisite_type')
     
-    if transform_errors > 0:
-        print(f"  ⚠️  {transform_errors} courses failed to transform")
+    # Representative CRN -> sections of courses that still need fetching
+    pending = {}
+    fetched_keys = set()
+    reused = 0
+    for key, sections in groups.items():
+        if known and key in known:
+            apply(sections, known[key])
+            reused += 1
+            continue
+        desc_info = None
+        if checkpoint is not None:
+            desc_info = next((checkpoint.descriptions[s['crn']] for s in sections if s['crn'] in checkpoint.descriptions), None)
+        if desc_info is not None:
+            apply(sections, desc_info)
+            fetched_keys.add(key)
+        else:
+            pending[sections[0]['crn']] = sections
     
-    if not transformed:
-        print(f"  ⚠️  No valid courses to upload after transformation")
-        return 0, transform_errors
+    desc_fetch_errors = 0
+    fetched = 0
     
-    # Fetch descriptions and prerequisites if requested
-    if fetch_descriptions:
-        print(f"  📖 Fetching course descriptions and prerequisites...")
-        from scraper import fetch_course_description, setup_session
-        import time
-        
+    if queue is not None:
+        queue.publish(run_id, 'description', term_code, {crn: {} for crn in pending})
+        if not queue.wait_for(run_id, 'description', term_code):
+            warn_unfinished(run_id, 'description', term_code)
+        results, errors = queue.results(run_id, 'description', term_code)
+        for crn, sections in pending.items():
+            if crn not in results:
+                desc_fetch_errors += 1
+                if desc_fetch_errors < 5:
+                    print(f"    ⚠️  Error fetching description for CRN {crn}: {errors.get(crn, 'not finished')}")
+                continue
+            apply(sections, results[crn])
+            fetched_keys.add(course_key(sections[0], term_code))
+            fetched += 1
+            if checkpoint is not None:
+                checkpoint.add_description(crn, results[crn])
+    else:
         # Create a session for fetching descriptions
-        base_url = "https://prodrg.mtsac.edu/StudentRegistrationSsb/ssb"
+        base_url = BASE_URL
         session, headers = setup_session(term_code, base_url)
         
-        desc_fetch_errors = 0
-        for i, course_data in enumerate(transformed):
+        for crn, sections in pending.items():
             try:
                 # Rate limiting - small delay to avoid overwhelming server
-                if i > 0 and i % 20 == 0:
+                if fetched > 0 and fetched % 20 == 0:
                     time.sleep(0.5)
-                    print(f"    Fetched {i}/{len(transformed)} descriptions...")
+                    print(f"    Fetched {fetched}/{len(pending)} descriptions...")
                 
                 desc_info = fetch_course_description(
                     term_code, 
-                    course_data['crn'],
+                    crn,
                     session=session,
                     headers=headers
                 )
+                fetched += 1
+                
+                if 'error' in desc_info:
+                    raise RuntimeError(desc_info['error'])
+                
+                apply(sections, desc_info)
+                fetched_keys.add(course_key(sections[0], term_code))
                 
-                course_data['course_description'] = desc_info.get('description')
-                course_data['prerequisites'] = desc_info.get('prerequisites')
+                if checkpoint is not None:
+                    checkpoint.add_description(crn, desc_info)
                 
             except Exception as e:
                 desc_fetch_errors += 1
                 if desc_fetch_errors < 5:  # Only print first few errors
-                    print(f"    ⚠️  Error fetching description for CRN {course_data['crn']}: {e}")
-        
-        if desc_fetch_errors > 0:
-            print(f"    ⚠️  {desc_fetch_errors} courses failed to fetch descriptions")
-        print(f"    ✓ Fetched descriptions for {len(transformed) - desc_fetch_errors} courses")
+                    print(f"    ⚠️  Error fetching description for CRN {crn}: {e}")
+    
+    for sections in pending.values():
+        if course_key(sections[0], term_code) not in fetched_keys:
+            for course_data in sections:
+                for column in ('course_description', 'prerequisites', 'prerequisite_type'):
+                    if column in course_data:
+                        del course_data[column]
+    
+    metrics.inc('descriptions_fetched_total', fetched, term=term_code)
+    metrics.inc('descriptions_reused_total', reused, term=term_code)
+    if desc_fetch_errors > 0:
+        print(f"    ⚠️  {desc_fetch_errors} courses failed to fetch descriptions")
+    print(f"    ✓ Fetched descriptions for {len(groups) - desc_fetch_errors} courses ({len(pending)} fetched, "
+          f"{reused} from the catalog, {len(groups) - len(pending) - reused} from checkpoint)")
+    return fetched_keys
+
+def warn_unfinished(run_id, kind, term_code):
+    """
+    After wait_for timed out: unfinished tasks count as failed for this run, but
+    stay queued, so rerunning with the same run ID picks up what workers finish.
+    """
+    metrics.inc('queue_timeouts_total', kind=kind, term=term_code)
+    print(f"    ⚠️  Unfinished {kind} tasks are treated as failed; rerun with --run-id {run_id} to use them once done")
+
+def scrape_term_distributed(term_code, queue, run_id, failed_subjects=None):
+    """
+    Publish one task per subject to the work queue, wait for the workers and
+    merge their results. Returns list of course dictionaries.
+    """
+    from scraper import get_subjects
+    
+    print(f"🔍 Publishing scrape tasks for term {term_code} (run {run_id})...")
+    subjects = get_subjects(term_code)
+    print(f"Found {len(subjects)} subjects\n")
+    
+    if not subjects:
+        print("  ⚠️  No subjects found, trying direct course search...")
+        from scraper import search_all_courses_direct
+        return search_all_courses_direct(term_code, failed_subjects)
+    
+    queue.publish(run_id, 'subject', term_code, {subject['code']: subject for subject in subjects})
+    if not queue.wait_for(run_id, 'subject', term_code):
+        warn_unfinished(run_id, 'subject', term_code)
+    results, errors = queue.results(run_id, 'subject', term_code)
+    
+    all_courses = []
+    for subject in subjects:
+        all_courses.extend(results.get(subject['code'], []))
+    
+    missing = [subject['code'] for subject in subjects if subject['code'] not in results]
+    if missing:
+        print(f"\n⚠️  {len(missing)} subjects failed or unfinished: {', '.join(sorted(missing))}")
+        if failed_subjects is not None:
+            failed_subjects.extend(missing)
+    
+    crns = set([c['courseReferenceNumber'] for c in all_courses])
+    print(f"\n✅ Done! Merged {len(all_courses)} courses ({len(crns)} unique CRNs) from workers")
+    return all_courses
+
+def delete_removed_sections(client, term_code, crns):
+    """Delete sections no longer offered from Supabase. Returns the CRNs actually deleted."""
+    deleted = []
+    for batch in chunks(crns):
+        try:
+            client.table('sections').delete().eq('term', term_code).in_('crn', batch).execute()
+            deleted.extend(batch)
+        except Exception as e:
+            print(f"    ✗ Error deleting {len(batch)} removed sections: {e}")
+    if deleted:
+        metrics.inc('rows_deleted_total', len(deleted), term=term_code)
+        print(f"  🗑️  Deleted {len(deleted)} sections no longer offered")
+    return set(deleted)
+
+def upload_courses_to_supabase(courses, term_code, fetch_descriptions=True, checkpoint=None, queue=None, run_id=None,
+                               dry_run=False, snapshots=False, failed_subjects=None, detect_removed=True):
+    """
+    Upload transformed courses to Supabase: the text shared by a course's sections
+    to course_catalog (only rows that changed) and everything else to sections.
+    Descriptions already in `checkpoint` are reused instead of fetched again,
+    and are fetched through the work queue if one is given. With `dry_run`,
+    everything up to the upload runs but nothing is written to Supabase or the mirror.
+    The `courses` list is emptied once transformed, so the raw Banner dicts can be freed.
+    `courses` may also be an iterator (a streamed direct search); each course is then
+    transformed as it arrives and never held alongside the others; the time spent
+    waiting for it is recorded as the scrape stage, not the transform.
+    With `snapshots`, an hourly snapshot of the subject rollups is recorded too.
+    Courses in `failed_subjects` (not scraped this run) are never treated as removed,
+    and subjects with courses that fail to transform are added to it. Sections are
+    only deleted as removed when `detect_removed` is on, i.e. `courses` is a whole
+    scrape rather than a file that may be stale or partial.
+    """
+    if not courses:
+        print(f"  ⚠️  No courses to upload for term {term_code}")
+        return 0, 0
+    
+    if isinstance(courses, list):
+        print(f"  🔄 Transforming {len(courses)} courses...")
+    else:
+        print(f"  🔄 Transforming courses as they are parsed...")
+    transformed = CourseStore()
+    transform_errors = 0
+    if failed_subjects is None:
+        failed_subjects = []
+    updated_at = datetime.now().isoformat()
+    
+    with metrics.profile_stage('transform', term_code) as stage:
+        transform_start = time.perf_counter()
+        # A streamed search downloads and parses as it is iterated; that time counts as scraping
+        source = courses if isinstance(courses, list) else stage.iterate(courses, 'scrape')
+        for course in source:
+            try:
+                transformed.append(transform_course(course, updated_at=updated_at))
+            except Exception as e:
+                transform_errors += 1
+                print(f"    ⚠️  Error transforming course CRN {course.get('courseReferenceNumber', 'unknown')}: {e}")
+                # The subject is incomplete now, so its missing sections must not look removed
+                if course.get('subject') and course['subject'] not in failed_subjects:
+                    failed_subjects.append(course['subject'])
+        transform_seconds = time.perf_counter() - transform_start - stage.moved_seconds()
+    if isinstance(courses, list):
+        courses.clear()
+    
+    metrics.inc('rows_transformed_total', len(transformed), term=term_code)
+    if transform_seconds > 0:
+        metrics.set_gauge('rows_transformed_per_second', round(len(transformed) / transform_seconds, 1), term=term_code)
+    
+    if transform_errors > 0:
+        print(f"  ⚠️  {transform_errors} courses failed to transform")
+    
+    if not transformed:
+        print(f"  ⚠️  No valid courses to upload after transformation")
+        return 0, transform_errors
+    
+    mirror = Mirror()
+    catalog = Catalog(mirror.path)
+    stored_catalog = catalog.load(term_code)
+    
+    # Fetch descriptions and prerequisites if requested
+    fetched_keys = set()
+    if fetch_descriptions:
+        with metrics.profile_stage('descriptions', term_code):
+            fetched_keys = fetch_descriptions_for(transformed, term_code, checkpoint, queue=queue, run_id=run_id,
+                                                  known=catalog.fresh_descriptions(stored_catalog))
+    else:
+        # Leave the stored descriptions alone instead of overwriting them with NULL
+        transformed.drop_columns('course_description', 'prerequisites', 'prerequisite_type')
     
-    print(f"  💾 Uploading {len(transformed)} courses to Supabase...")
-    batch_size = 100
-    total_batches = (len(transformed) + batch_size - 1) // batch_size
+    # Catalog rows are shared by every section of a course; only changed ones are uploaded
+    catalog_changed = catalog.changed_rows(stored_catalog, transformed, term_code)
+    print(f"  📚 {len(catalog_changed)} of {len(group_by_course(transformed, term_code))} catalog entries changed")
+    
+    # Count rows that differ from what the previous run uploaded; only hashes are
+    # loaded here, the full mirrored rows later for just the changed and missing CRNs
+    stored_hashes = mirror.hashes(term_code)
+    changed_crns = {row['crn'] for row in mirror.changed_rows(stored_hashes, transformed)}
+    missing_crns = stored_hashes.keys() - {row['crn'] for row in transformed}
+    del stored_hashes
+    rows_changed = len(changed_crns)
+    metrics.inc('rows_changed_total', rows_changed, term=term_code)
+    print(f"  🔍 {rows_changed} of {len(transformed)} courses changed since the last run")
+    
+    if dry_run:
+        print(f"  🧪 Dry run: skipping upload of {len(transformed)} courses")
+        return len(transformed), transform_errors
+    
+    supabase = get_supabase()
+    
+    # Catalog first, so the courses view never shows a new section without its title
+    with metrics.profile_stage('catalog', term_code):
+        catalog_uploaded = sync_catalog(supabase, catalog, term_code, stored_catalog, catalog_changed, fetched_keys)
+    metrics.inc('catalog_rows_upserted_total', catalog_uploaded, term=term_code)
+    
+    print(f"  💾 Uploading {len(transformed)} sections to Supabase...")
+    total_batches = (len(transformed) + BATCH_SIZE - 1) // BATCH_SIZE
     success_count = 0
     error_count = 0
+    uploaded = []
     
-    for i in range(0, len(transformed), batch_size):
-        batch = transformed[i:i + batch_size]
-        batch_num = i // batch_size + 1
+    with metrics.profile_stage('upload', term_code):
+        for batch_num, batch in enumerate(transformed.batches(BATCH_SIZE), start=1):
+            try:
+                with metrics.timer('upsert_batch_duration_seconds', term=term_code):
+                    response = supabase.table('sections').upsert([section_row(row) for row in batch]).execute()
+                success_count += len(batch)
+                uploaded.extend(batch)
+                metrics.inc('rows_upserted_total', len(batch), term=term_code)
+                print(f"    ✓ Uploaded batch {batch_num}/{total_batches} ({len(batch)} courses)")
+            except Exception as e:
+                error_count += len(batch)
+                print(f"    ✗ Error in batch {batch_num}: {e}")
+                # Try to continue with next batch
+                import traceback
+                traceback.print_exc()
+    
+    # Mirror what Supabase now has; rows in failed batches still count as changed next run
+    changed_uploaded = [row for row in uploaded if row['crn'] in changed_crns]
+    removed_crns = []
+    previous_rows = {}
+    mirrored = False
+    try:
+        previous_rows = mirror.rows(term_code, changed_crns | missing_crns)
+        changes = diff_rows(previous_rows, changed_uploaded, scraped=transformed,
+                            detect_removed=detect_removed, incomplete=set(failed_subjects))
+        # Sections no longer offered leave Supabase in the same step that drops them from
+        # the mirror, the rollups and the feed; ones whose delete failed are retried next run
+        removed_crns = delete_removed_sections(
+            supabase, term_code, [change['crn'] for change in changes if change['kind'] == 'removed'])
+        changes = [change for change in changes if change['kind'] != 'removed' or change['crn'] in removed_crns]
+        mirror.upsert(term_code, changed_uploaded, previous_rows)
+        mirror.touch(term_code, [row['crn'] for row in uploaded if row['crn'] not in changed_crns])
+        mirror.remove(term_code, removed_crns)
+        mirrored = True
+        mirror.record_run(term_code, len(transformed), rows_changed, error_count + transform_errors)
         
+        # Publish the diff to clients following the change feed
+        if changes:
+            version = ChangeLog(mirror.path).publish(term_code, changes)
+            metrics.inc('changes_published_total', len(changes), term=term_code)
+            print(f"  📡 Published {len(changes)} changes (feed version {version})")
+    except Exception as e:
+        print(f"  ⚠️  Error updating local mirror: {e}")
+    
+    # Per-subject availability totals, updated from the rows that changed
+    if mirrored:
         try:
-            response = supabase.table('courses').upsert(batch).execute()
-            success_count += len(batch)
-            print(f"    ✓ Uploaded batch {batch_num}/{total_batches} ({len(batch)} courses)")
+            with metrics.profile_stage('rollups', term_code):
+                sync_rollups(supabase, mirror.path, term_code, previous_rows, changed_uploaded, removed_crns,
+                             snapshot=snapshots)
         except Exception as e:
-            error_count += len(batch)
-            print(f"    ✗ Error in batch {batch_num}: {e}")
-            # Try to continue with next batch
-            import traceback
-            traceback.print_exc()
+            print(f"  ⚠️  Error updating rollups: {e}")
+    
+    # Keep the prerequisite graph in step with the descriptions just fetched
+    if fetch_descriptions:
+        try:
+            with metrics.profile_stage('prereqs', term_code):
+                sync_prereq_graph(supabase, term_code, transformed, failed_subjects)
+        except Exception as e:
+            print(f"  ⚠️  Error updating prerequisite graph: {e}")
     
     return success_count, error_count + transform_errors
 
-def process_term(term_code, term_desc=None, save_json=False):
+def term_summary(term_code, wall_seconds, http_requests, success_count, error_count, failed_subjects):
+    """Per-term entry for the run report, built from the collected metrics"""
+    upserts = metrics.histogram('upsert_batch_duration_seconds', term=term_code)
+    scrape = metrics.histogram('stage_duration_seconds', stage='scrape', term=term_code)
+    return {
+        'term': term_code,
+        'wall_seconds': round(wall_seconds, 2),
+        'http_requests': http_requests,
+        'requests_per_second': round(http_requests / wall_seconds, 2) if wall_seconds > 0 else None,
+        'scrape_seconds': round(scrape['sum'], 2) if scrape else None,
+        'rows_transformed': metrics.counter_total('rows_transformed_total', term=term_code),
+        'rows_transformed_per_second': metrics.gauge('rows_transformed_per_second', term=term_code),
+        'rows_changed': metrics.counter_total('rows_changed_total', term=term_code),
+        'rows_uploaded': success_count,
+        'errors': error_count,
+        'failed_subjects': sorted(failed_subjects),
+        'upsert_batches': upserts['count'] if upserts else 0,
+        'upsert_batch_avg_seconds': round(upserts['sum'] / upserts['count'], 3) if upserts else None,
+        'upsert_batch_max_seconds': round(upserts['max'], 3) if upserts else None,
+        'peak_rss_bytes': metrics.gauge('peak_rss_bytes', term=term_code),
+    }
+
+def process_term(term_code, term_desc=None, save_json=False, resume=True, term_reports=None, fetch_descriptions=True,
+                 queue=None, run_id=None, dry_run=False, snapshots=False):
     """
     Process a single term: scrape and upload to Supabase.
     
@@ -237,33 +520,78 @@ def process_term(term_code, term_desc=None, save_json=False):
         term_code: Term code (e.g., "202540")
         term_desc: Optional term description
         save_json: Whether to save scraped data to JSON file
+        resume: Whether to resume from a checkpoint left by an interrupted run
+        term_reports: Optional list to append this term's run report entry to
+        fetch_descriptions: Whether to fetch descriptions/prerequisites (False for a quick seats-only refresh)
+        queue: Optional WorkQueue to hand scraping and description fetches to workers
+        run_id: Work queue run ID (reuse one to resume an interrupted distributed run)
+        dry_run: Scrape and transform as usual but don't write to Supabase
+        snapshots: Record an hourly snapshot of the subject rollups (used during registration)
     """
     print(f"\n{'='*60}")
     print(f"📚 Processing Term: {term_code} ({term_desc or 'N/A'})")
     print(f"{'='*60}\n")
     
+    term_start = time.perf_counter()
+    requests_before = metrics.counter_total('http_requests_total')
+    failed_subjects = []
+    success_count, error_count = 0, 0
+    checkpoint = None
+    # ru_maxrss only ever grows, so a term's own peak needs the high-water mark reset
+    rss_reset = metrics.reset_peak_rss()
+    
     try:
+        checkpoint = Checkpoint(term_code, resume=resume)
+        
         # Scrape courses
-        courses = scrape_all_courses(term_code, max_workers=5)
+        with metrics.profile_stage('scrape', term_code):
+            if queue is not None:
+                courses = scrape_term_distributed(term_code, queue, run_id, failed_subjects=failed_subjects)
+            else:
+                from scraper import scrape_all_courses
+                courses = scrape_all_courses(term_code, max_workers=5, checkpoint=checkpoint, failed_subjects=failed_subjects)
         
         if not courses:
             print(f"  ⚠️  No courses found for term {term_code}")
+            checkpoint.finish(failed_subjects)
             return 0, 0
         
         # Save to JSON if requested
         if save_json:
+            courses = list(courses)
             filename = f"mtsac_{term_code}.json"
             with open(filename, 'w') as f:
                 json.dump(courses, f, indent=2)
             print(f"  💾 Saved to {filename}")
         
         # Upload to Supabase
-        success_count, error_count = upload_courses_to_supabase(courses, term_code)
+        success_count, error_count = upload_courses_to_supabase(
+            courses, term_code, fetch_descriptions=fetch_descriptions, checkpoint=checkpoint, queue=queue, run_id=run_id,
+            dry_run=dry_run, snapshots=snapshots, failed_subjects=failed_subjects
+        )
+        
+        # Static shards for the search page, from what the mirror now holds
+        if not dry_run:
+            try:
+                with metrics.profile_stage('shards', term_code):
+                    written, unchanged = export_term(term_code)
+                metrics.inc('shards_written_total', written, term=term_code)
+                print(f"  🗂️  Static shards: {written} written, {unchanged} unchanged")
+            except Exception as e:
+                print(f"  ⚠️  Error exporting static shards: {e}")
         
         print(f"\n  ✅ Term {term_code} complete!")
         print(f"     Successfully uploaded: {success_count} courses")
         if error_count > 0:
             print(f"     ❌ Errors: {error_count} courses")
+        if failed_subjects:
+            print(f"     ⚠️  Subjects not scraped: {', '.join(sorted(failed_subjects))} (will retry on next run)")
+        
+        # Only a killed run resumes from the journal; a finished one keeps just its failures
+        if error_count == 0 and not failed_subjects:
+            checkpoint.clear()
+        else:
+            checkpoint.finish(failed_subjects)
         
         return success_count, error_count
         
@@ -271,38 +599,101 @@ def process_term(term_code, term_desc=None, save_json=False):
         print(f"  ❌ Error processing term {term_code}: {e}")
         import traceback
         traceback.print_exc()
+        if checkpoint is not None:
+            checkpoint.finish(failed_subjects)
         return 0, 0
+    
+    finally:
+        metrics.set_gauge('process_peak_rss_bytes', metrics.peak_rss_bytes())
+        if rss_reset:
+            metrics.set_gauge('peak_rss_bytes', metrics.term_peak_rss_bytes(), term=term_code)
+        if term_reports is not None:
+            term_reports.append(term_summary(
+                term_code,
+                time.perf_counter() - term_start,
+                metrics.counter_total('http_requests_total') - requests_before,
+                success_count,
+                error_count,
+                failed_subjects,
+            ))
+
+def upload_from_file(json_file, term_code=None, dry_run=False):
+    """
+    Upload courses saved by --save-json (or any Banner search results file)
+    without scraping. Seat data only; stored descriptions are left alone. The
+    file may be stale or partial, so sections missing from it are never deleted.
+    """
+    print(f"📁 Loading courses from {json_file}...")
+    with open(json_file, 'r') as f:
+        courses = json.load(f)
+    print(f"✓ Loaded {len(courses)} courses")
+    
+    by_term = {}
+    for course in courses:
+        by_term.setdefault(term_code or course.get('term'), []).append(course)
+    
+    total_success = 0
+    total_errors = 0
+    for term, term_courses in by_term.items():
+        print(f"\n📚 Term {term}: {len(term_courses)} courses")
+        success, errors = upload_courses_to_supabase(term_courses, term, fetch_descriptions=False, dry_run=dry_run,
+                                                     detect_removed=False)
+        total_success += success
+        total_errors += errors
+    return total_success, total_errors
+
+def main(argv=None):
+    """Main function to process terms (same as `python cli.py scrape`)"""
+    from cli import scrape_parser
+    run(scrape_parser().parse_args(argv))
 
-def main():
-    """Main function to process terms"""
-    import argparse
+def run(args):
+    """Process the terms selected by the scrape arguments (see cli.add_scrape_arguments)"""
+    if args.profile:
+        os.environ['SACTRACK_PROFILE'] = args.profile
+    run_start = time.perf_counter()
+    term_reports = []
     
-    parser = argparse.ArgumentParser(description='Scrape and upload Mt. SAC courses to Supabase')
-    parser.add_argument('--terms', nargs='+', help='Specific term codes to process (e.g., 202540 202630)')
-    parser.add_argument('--all-future', action='store_true', help='Process all future terms')
-    parser.add_argument('--years', type=int, default=2, help='Number of years ahead to process (default: 2)')
-    parser.add_argument('--save-json', action='store_true', help='Save scraped data to JSON files')
-    parser.add_argument('--update-only', help='Update only this specific term code')
+    queue = None
+    run_id = args.run_id or datetime.now().strftime('%Y%m%d%H%M%S')
+    if args.distributed:
+        from workqueue import DEFAULT_DB, WorkQueue, enable_global_rate_limit, start_local_workers
+        queue = WorkQueue(args.queue_db or DEFAULT_DB)
+        enable_global_rate_limit(queue, args.rate)
+        if args.local_workers:
+            start_local_workers(queue, args.local_workers)
     
-    args = parser.parse_args()
+    # Options shared by every process_term call
+    term_options = {
+        'save_json': args.save_json,
+        'resume': not args.fresh,
+        'term_reports': term_reports,
+        'fetch_descriptions': not args.seats_only,
+        'queue': queue,
+        'run_id': run_id,
+        'dry_run': args.dry_run,
+        'snapshots': args.snapshots,
+    }
     
     print("🚀 Mt. SAC Course Scraper & Uploader")
     print("=" * 60)
-    print(f"✓ Connected to Supabase")
-    print(f"  URL: {SUPABASE_URL}\n")
+    if args.dry_run:
+        print("🧪 Dry run: nothing will be written to Supabase\n")
+    else:
+        print(f"  Supabase: {supabase_credentials()[0]}\n")
     
     total_success = 0
     total_errors = 0
     
     if args.update_only:
         # Update single term
-        success, errors = process_term(args.update_only, save_json=args.save_json)
+        success, errors = process_term(args.update_only, **term_options)
         total_success += success
         total_errors += errors
     elif args.terms:
         # Process specific terms
         for term_code in args.terms:
-            success, errors = process_term(term_code, save_json=args.save_json)
+            success, errors = process_term(term_code, **term_options)
             total_success += success
             total_errors += errors
     elif args.all_future:
@@ -311,7 +702,7 @@ def main():
         print(f"📅 Found {len(terms)} terms to process\n")
         
         for term in terms:
-            success, errors = process_term(term['code'], term['description'], save_json=args.save_json)
+            success, errors = process_term(term['code'], term['description'], **term_options)
             total_success += success
             total_errors += errors
     else:
@@ -320,7 +711,7 @@ def main():
         print(f"📅 Processing {len(terms)} terms (current + next year)\n")
         
         for term in terms:
-            success, errors = process_term(term['code'], term['description'], save_json=args.save_json)
+            success, errors = process_term(term['code'], term['description'], **term_options)
             total_success += success
             total_errors += errors
     
@@ -331,6 +722,19 @@ def main():
     if total_errors > 0:
         print(f"   Total errors: {total_errors} courses")
     print(f"{'='*60}")
+    
+    if queue is not None and total_errors == 0:
+        queue.purge(run_id)
+    
+    if args.metrics_report:
+        metrics.write_report(args.metrics_report, summary={
+            'total_success': total_success,
+            'total_errors': total_errors,
+            'duration_seconds': round(time.perf_counter() - run_start, 2),
+            'process_peak_rss_bytes': metrics.peak_rss_bytes(),
+            'terms': term_reports,
+        })
+        print(f"📊 Run report saved to {args.metrics_report}")
 
 if __name__ == "__main__":
     main()
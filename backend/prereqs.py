@@ -0,0 +1,292 @@
+# prereqs.py
+"""
+Prerequisite graph with precomputed reachability.
+
+The Advisory/Prerequisite/Corequisite text of each course is parsed into course
+references ("MATH 71"), which become edges of a per-term graph. The transitive
+closure is precomputed and stored in Supabase, so questions like "what can I
+take after MATH 71?" or "everything I need before PHYS 4A" are single indexed
+lookups instead of regex scans over every course row.
+
+Only courses whose prerequisite text changed since the last run are re-parsed,
+and only those courses and the courses downstream of them get new closure rows.
+Corequisites are kept as edges but left out of the closure, since they are taken
+together rather than before.
+
+Usage:
+    python prereqs.py unlocks "MATH 71" --term 202640
+    python prereqs.py requires "PHYS 4A" --term 202640
+    python prereqs.py depth "PHYS 4A" --term 202640
+"""
+import hashlib
+import json
+import os
+import re
+
+from config import chunks
+
+STATE_DIR = "state"
+
+# Edge kinds that mean "take before"; corequisites don't order courses
+ORDERING_KINDS = {'prerequisite', 'advisory'}
+
+COURSE_REF_PATTERN = re.compile(r'\b([A-Z]{2,5})\s?-?\s?(\d{1,3}[A-Z]{0,2})\b')
+
+# "MATH 71, 71B or 71C": bare numbers after a reference keep its subject, unless they
+# are amounts ("MATH 71 and 2 years of algebra", "or 3.0 GPA")
+CONTINUATION_PATTERN = re.compile(
+    r'\s*(?:,|/|\bor\b|\band\b)\s*(\d{1,3}[A-Z]{0,2})\b'
+    r'(?!\.\d|\s*(?i:years?|units?|semesters?|quarters?|hours?|credits?|months?|weeks?)\b)'
+)
+
+def course_id(subject, course_number):
+    """Graph node name for a course, e.g. 'MATH 71'"""
+    return f"{subject} {course_number}"
+
+def parse_course_refs(text, known_subjects=None):
+    """
+    Course references in prerequisite text, in order of appearance.
+    With `known_subjects`, words that aren't subject codes (e.g. 'GPA') are ignored.
+    """
+    if not text:
+        return []
+
+    refs = []
+    for match in COURSE_REF_PATTERN.finditer(text):
+        subject = match.group(1)
+        if known_subjects is not None and subject not in known_subjects:
+            continue
+        refs.append(course_id(subject, match.group(2)))
+
+        position = match.end()
+        while True:
+            continuation = CONTINUATION_PATTERN.match(text, position)
+            if continuation is None:
+                break
+            refs.append(course_id(subject, continuation.group(1)))
+            position = continuation.end()
+
+    return list(dict.fromkeys(refs))
+
+def text_hash(kind, text):
+    return hashlib.sha1(f"{kind or ''}|{text or ''}".encode()).hexdigest()[:16]
+
+def sources_from_rows(transformed, term_code):
+    """
+    One prerequisite source per course from transformed section rows. Courses
+    whose description fetch failed have no prerequisite columns and are left out.
+    """
+    sources = {}
+    for row in transformed:
+        node = course_id(row.get('subject'), row.get('course_number'))
+        if node in sources or (row.get('term') or term_code) != term_code or 'prerequisites' not in row:
+            continue
+        kind = (row.get('prerequisite_type') or '').lower() or None
+        text = row.get('prerequisites')
+        sources[node] = {'kind': kind, 'text': text, 'hash': text_hash(kind, text)}
+    return sources
+
+def build_edges(node, source, known_subjects=None):
+    """Edges out of one course: {required course: kind}"""
+    if not source['text']:
+        return {}
+    kind = source['kind'] or 'prerequisite'
+    return {ref: kind for ref in parse_course_refs(source['text'], known_subjects) if ref != node}
+
+def descendants(edges, nodes):
+    """Every course that (transitively) requires any of `nodes`"""
+    dependents = {}
+    for course, requires in edges.items():
+        for required, kind in requires.items():
+            if kind in ORDERING_KINDS:
+                dependents.setdefault(required, set()).add(course)
+
+    seen = set()
+    stack = list(nodes)
+    while stack:
+        for dependent in dependents.get(stack.pop(), ()):
+            if dependent not in seen:
+                seen.add(dependent)
+                stack.append(dependent)
+    return seen
+
+def compute_closure(edges, nodes=None):
+    """
+    Transitive prerequisites of each course: {course: {ancestor: depth}}, where
+    depth is the length of the longest prerequisite chain from ancestor to course.
+    Cycles (which do show up in catalog data) are broken where they are found.
+    """
+    memo = {}
+    in_progress = set()
+
+    def ancestors(course):
+        """(ancestors, whether the result is complete rather than cut short by a cycle)"""
+        if course in memo:
+            return memo[course], True
+        in_progress.add(course)
+        result = {}
+        complete = True
+        for required, kind in edges.get(course, {}).items():
+            if kind not in ORDERING_KINDS:
+                continue
+            result[required] = max(result.get(required, 0), 1)
+            if required in in_progress:
+                complete = False
+                continue
+            required_ancestors, required_complete = ancestors(required)
+            complete = complete and required_complete
+            for ancestor, depth in required_ancestors.items():
+                if ancestor != course:
+                    result[ancestor] = max(result.get(ancestor, 0), depth + 1)
+        in_progress.discard(course)
+        # Results cut short by a cycle depend on where the walk started, so don't reuse them
+        if complete:
+            memo[course] = result
+        return result, complete
+
+    return {course: ancestors(course)[0] for course in (edges if nodes is None else nodes)}
+
+def load_state(term_code):
+    path = os.path.join(STATE_DIR, f"prereqs_{term_code}.json")
+    if not os.path.exists(path):
+        return {'hashes': {}, 'edges': {}}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def save_state(term_code, state):
+    os.makedirs(STATE_DIR, exist_ok=True)
+    path = os.path.join(STATE_DIR, f"prereqs_{term_code}.json")
+    with open(f"{path}.tmp", 'w') as f:
+        json.dump(state, f)
+    os.replace(f"{path}.tmp", path)
+
+def update_graph(state, sources, known_subjects=None, keep=()):
+    """
+    Apply the current prerequisite sources to the previous graph state. Courses
+    in `keep` have no source this run (failed subject or description fetch) but
+    are still offered, so their stored edges stay as they are.
+    Returns (new_state, changed courses, courses whose closure must be rebuilt).
+    """
+    old_edges = state['edges']
+    new_edges = dict(old_edges)
+    hashes = dict(state['hashes'])
+
+    changed = set()
+    for node, source in sources.items():
+        if hashes.get(node) != source['hash']:
+            changed.add(node)
+            hashes[node] = source['hash']
+            new_edges[node] = build_edges(node, source, known_subjects)
+    for node in set(hashes) - set(sources) - set(keep):
+        # Course no longer offered this term
+        changed.add(node)
+        del hashes[node]
+        new_edges.pop(node, None)
+
+    affected = changed | descendants(old_edges, changed) | descendants(new_edges, changed)
+    return {'hashes': hashes, 'edges': new_edges}, changed, affected
+
+def sync_prereq_graph(client, term_code, transformed, failed_subjects=()):
+    """
+    Update the stored prerequisite graph for a term from freshly scraped rows.
+    Only courses whose prerequisite text changed (and their dependents) are rewritten.
+    A course only counts as no longer offered when its subject was scraped
+    (not in `failed_subjects`) and none of its sections came back.
+    """
+    sources = sources_from_rows(transformed, term_code)
+    failed_subjects = set(failed_subjects)
+    known_subjects = {row.get('subject') for row in transformed} | failed_subjects
+    offered = {course_id(row.get('subject'), row.get('course_number')) for row in transformed}
+
+    state = load_state(term_code)
+    keep = {node for node in state['hashes'] if node in offered or node.split(' ', 1)[0] in failed_subjects}
+    state, changed, affected = update_graph(state, sources, known_subjects, keep)
+    if not changed:
+        print(f"  🔗 Prerequisite graph unchanged")
+        return 0
+
+    closure = compute_closure(state['edges'], affected)
+
+    # Rows for every affected course, since a dependent's chain depth can change too
+    course_rows = [
+        {
+            'term': term_code,
+            'course': node,
+            'prerequisite_type': sources[node]['kind'],
+            'prerequisites': sources[node]['text'],
+            'text_hash': sources[node]['hash'],
+            'chain_depth': max(closure.get(node, {}).values(), default=0),
+        }
+        for node in affected & set(sources)
+    ]
+
+    edge_rows = [
+        {'term': term_code, 'course': node, 'requires': required, 'kind': kind}
+        for node in changed for required, kind in state['edges'].get(node, {}).items()
+    ]
+    closure_rows = [
+        {'term': term_code, 'course': node, 'ancestor': ancestor, 'depth': depth}
+        for node in affected for ancestor, depth in closure.get(node, {}).items()
+    ]
+
+    for batch in chunks(changed - set(sources)):
+        client.table('prereq_courses').delete().eq('term', term_code).in_('course', batch).execute()
+    for batch in chunks(course_rows):
+        client.table('prereq_courses').upsert(batch).execute()
+    for batch in chunks(changed):
+        client.table('prereq_edges').delete().eq('term', term_code).in_('course', batch).execute()
+    for batch in chunks(edge_rows):
+        client.table('prereq_edges').insert(batch).execute()
+    for batch in chunks(affected):
+        client.table('prereq_closure').delete().eq('term', term_code).in_('course', batch).execute()
+    for batch in chunks(closure_rows):
+        client.table('prereq_closure').insert(batch).execute()
+
+    # Only remember the new state once Supabase has it
+    save_state(term_code, state)
+    print(f"  🔗 Prerequisite graph: {len(changed)} courses changed, {len(affected)} closures rebuilt "
+          f"({len(edge_rows)} edges, {len(closure_rows)} reachability rows)")
+    return len(changed)
+
+def unlocks(client, term_code, course):
+    """Courses that (transitively) require `course`, closest first"""
+    rows = client.table('prereq_closure').select('course, depth') \
+        .eq('term', term_code).eq('ancestor', course).order('depth').execute().data
+    return [(row['course'], row['depth']) for row in rows]
+
+def all_prerequisites(client, term_code, course):
+    """Everything that must come before `course`, furthest first"""
+    rows = client.table('prereq_closure').select('ancestor, depth') \
+        .eq('term', term_code).eq('course', course).order('depth', desc=True).execute().data
+    return [(row['ancestor'], row['depth']) for row in rows]
+
+def chain_depth(client, term_code, course):
+    """Length of the longest prerequisite chain leading to `course` (0 if none)"""
+    rows = client.table('prereq_courses').select('chain_depth') \
+        .eq('term', term_code).eq('course', course).execute().data
+    return rows[0]['chain_depth'] if rows else 0
+
+def main():
+    import argparse
+    from config import get_supabase
+
+    parser = argparse.ArgumentParser(description='Query the prerequisite graph')
+    parser.add_argument('query', choices=['unlocks', 'requires', 'depth'])
+    parser.add_argument('course', help='Course, e.g. "MATH 71"')
+    parser.add_argument('--term', required=True, help='Term code (e.g., 202640)')
+    args = parser.parse_args()
+
+    client = get_supabase()
+    course = ' '.join(args.course.upper().split())
+
+    if args.query == 'unlocks':
+        for name, depth in unlocks(client, args.term, course):
+            print(f"{'  ' * (depth - 1)}{name}")
+    elif args.query == 'requires':
+        for name, depth in all_prerequisites(client, args.term, course):
+            print(f"{name} ({depth} step{'s' if depth > 1 else ''} before)")
+    else:
+        print(chain_depth(client, args.term, course))
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,11 @@
 # quick_update.py
 """
-Quick update script for testing - updates current term only
+Quick update script for testing - same as `python cli.py scrape`
 """
-import subprocess
 import sys
 
-if __name__ == "__main__":
-    print("🔄 Running quick update (current term only)...\n")
-    subprocess.run([sys.executable, "orchestrator.py"])
+from cli import main
 
+if __name__ == "__main__":
+    print("🔄 Running quick update...\n")
+    sys.exit(main(['scrape']))
@@ -0,0 +1,158 @@
+# reports.py
+"""
+Reports and bulk exports from the local mirror (mirror.py).
+
+Everything here reads the local SQLite copy of the courses table, so it runs
+in milliseconds with no Supabase round trips.
+
+Usage:
+    python reports.py terms
+    python reports.py fill-rates --term 202640
+    python reports.py instructors --term 202640
+    python reports.py waitlists --term 202640 --limit 20
+    python reports.py export --term 202640 --output courses_202640.csv
+    python reports.py export --term 202640 --output courses_202640.parquet   # needs duckdb
+"""
+import csv
+import sys
+import time
+
+from mirror import COURSE_COLUMNS, DEFAULT_PATH, Mirror
+
+def terms(mirror):
+    """Mirrored terms with section counts and when each was last refreshed"""
+    with mirror.connect() as conn:
+        rows = conn.execute("""
+            SELECT c.term, MAX(c.term_desc) AS term_desc, COUNT(*) AS sections,
+                   SUM(c.open_section) AS open_sections,
+                   (SELECT datetime(MAX(finished_at), 'unixepoch', 'localtime') FROM runs r WHERE r.term = c.term) AS last_run
+            FROM courses c
+            GROUP BY c.term
+            ORDER BY c.term
+        """).fetchall()
+    return [dict(row) for row in rows]
+
+def fill_rates(mirror, term_code):
+    """Enrollment against capacity per subject, fullest first"""
+    with mirror.connect() as conn:
+        rows = conn.execute("""
+            SELECT subject,
+                   COUNT(*) AS sections,
+                   SUM(open_section) AS open_sections,
+                   SUM(max_enrollment) AS capacity,
+                   SUM(current_enrollment) AS enrolled,
+                   SUM(seats_available) AS seats_left,
+                   SUM(waitlist_count) AS waitlisted,
+                   ROUND(100.0 * SUM(current_enrollment) / NULLIF(SUM(max_enrollment), 0), 1) AS fill_rate
+            FROM courses
+            WHERE term = ?
+            GROUP BY subject
+            ORDER BY fill_rate DESC
+        """, (term_code,)).fetchall()
+    return [dict(row) for row in rows]
+
+def instructors(mirror, term_code):
+    """Sections and students per instructor, busiest first"""
+    with mirror.connect() as conn:
+        rows = conn.execute("""
+            SELECT instructor_name,
+                   COUNT(*) AS sections,
+                   GROUP_CONCAT(DISTINCT subject) AS subjects,
+                   SUM(current_enrollment) AS enrolled
+            FROM courses
+            WHERE term = ? AND instructor_name IS NOT NULL AND instructor_name != 'TBA'
+            GROUP BY instructor_name
+            ORDER BY sections DESC, enrolled DESC
+        """, (term_code,)).fetchall()
+    return [dict(row) for row in rows]
+
+def waitlists(mirror, term_code, limit=20):
+    """Sections with the longest waitlists"""
+    with mirror.connect() as conn:
+        rows = conn.execute("""
+            SELECT crn, subject, course_number, section, title, instructor_name,
+                   waitlist_count, waitlist_capacity, seats_available
+            FROM courses
+            WHERE term = ? AND waitlist_count > 0
+            ORDER BY waitlist_count DESC
+            LIMIT ?
+        """, (term_code, limit)).fetchall()
+    return [dict(row) for row in rows]
+
+def export(mirror, term_code, output):
+    """Write every mirrored section of a term to CSV, or Parquet if duckdb is installed"""
+    if output.endswith('.parquet'):
+        try:
+            import duckdb
+        except ImportError:
+            print("❌ 'duckdb' is needed for Parquet export. Install with: pip install duckdb")
+            return 0
+        conn = duckdb.connect()
+        conn.execute("INSTALL sqlite; LOAD sqlite;")
+        conn.execute(
+            f"COPY (SELECT {', '.join(COURSE_COLUMNS)} FROM sqlite_scan(?, 'courses') WHERE term = ?) "
+            f"TO '{output}' (FORMAT PARQUET)",
+            [mirror.path, term_code]
+        )
+        return conn.execute(f"SELECT COUNT(*) FROM '{output}'").fetchone()[0]
+
+    with mirror.connect() as conn:
+        rows = conn.execute(
+            f"SELECT {', '.join(COURSE_COLUMNS)} FROM courses WHERE term = ? ORDER BY subject, course_number, section",
+            (term_code,)
+        )
+        with open(output, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(COURSE_COLUMNS)
+            count = 0
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+    return count
+
+def print_table(rows):
+    if not rows:
+        print("(no rows)")
+        return
+    columns = list(rows[0].keys())
+    widths = {c: max(len(c), *(len(str(r[c])) for r in rows)) for c in columns}
+    print('  '.join(c.ljust(widths[c]) for c in columns))
+    print('  '.join('-' * widths[c] for c in columns))
+    for row in rows:
+        print('  '.join(str(row[c]).ljust(widths[c]) for c in columns))
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Reports from the local course mirror')
+    parser.add_argument('report', choices=['terms', 'fill-rates', 'instructors', 'waitlists', 'export'])
+    parser.add_argument('--term', help='Term code (e.g., 202640)')
+    parser.add_argument('--limit', type=int, default=20, help='Rows for the waitlists report (default: 20)')
+    parser.add_argument('--output', help='Export file (.csv or .parquet)')
+    parser.add_argument('--db', default=DEFAULT_PATH, help=f'Mirror database (default: {DEFAULT_PATH})')
+    args = parser.parse_args()
+
+    if args.report != 'terms' and not args.term:
+        parser.error('--term is required for this report')
+    if args.report == 'export' and not args.output:
+        parser.error('--output is required for export')
+
+    mirror = Mirror(args.db)
+    start = time.perf_counter()
+
+    if args.report == 'terms':
+        print_table(terms(mirror))
+    elif args.report == 'fill-rates':
+        print_table(fill_rates(mirror, args.term))
+    elif args.report == 'instructors':
+        print_table(instructors(mirror, args.term))
+    elif args.report == 'waitlists':
+        print_table(waitlists(mirror, args.term, args.limit))
+    else:
+        count = export(mirror, args.term, args.output)
+        print(f"💾 Exported {count} sections to {args.output}")
+
+    print(f"\n⏱️  {(time.perf_counter() - start) * 1000:.1f} ms", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+# rollups.py
+"""
+Availability rollups per term and subject, kept up to date incrementally.
+
+Dashboards want totals per term and subject: sections, open sections, seats
+left, waitlisted, and sections with a UC credit limitation. Instead of
+aggregating every course row for each query, subject_rollups holds one row
+per (term, subject), and the term_rollups view sums those. Summary queries
+then read O(subjects) rows instead of O(sections).
+
+Each run turns the rows it actually changed into per-subject deltas, using the
+mirrored rows as the "before" side, and rewrites only the subjects those
+deltas touch. Totals are kept in the mirror database as well. If that local
+copy is missing (first run, or after a failed write), the term is rebuilt once
+from the mirror. With snapshots on (the scheduler turns them on during
+registration), the run also writes the term's totals into rollup_snapshots,
+one row per subject per hour.
+
+Usage:
+    python rollups.py --term 202640     # totals per subject from the local copy
+"""
+import time
+from datetime import datetime, timezone
+
+from config import chunks
+from mirror import DEFAULT_PATH, connect
+
+MEASURES = ['sections', 'open_sections', 'seats_left', 'waitlisted', 'uccl_sections']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollups (
+    term TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    sections INTEGER NOT NULL,
+    open_sections INTEGER NOT NULL,
+    seats_left INTEGER NOT NULL,
+    waitlisted INTEGER NOT NULL,
+    uccl_sections INTEGER NOT NULL,
+    PRIMARY KEY (term, subject)
+);
+"""
+
+def contribution(row):
+    """What one section adds to its subject's totals"""
+    return (
+        1,
+        1 if row.get('open_section') else 0,
+        max(row.get('seats_available') or 0, 0),
+        row.get('waitlist_count') or 0,
+        1 if row.get('has_uc_credit_limitation') else 0,
+    )
+
+def rollup_deltas(previous, changed, removed=()):
+    """
+    Per-subject changes to the totals: {subject: [delta per measure]}.
+    `previous` are the mirrored rows keyed by CRN, `changed` the rows that
+    differ from them and `removed` the CRNs of sections no longer offered.
+    """
+    deltas = {}
+
+    def add(subject, values, sign):
+        delta = deltas.setdefault(subject, [0] * len(MEASURES))
+        for i, value in enumerate(values):
+            delta[i] += sign * value
+
+    for row in changed:
+        before = previous.get(row['crn'])
+        if before is not None:
+            add(before.get('subject'), contribution(before), -1)
+            # Columns missing from the row (seats-only runs) keep their mirrored values
+            row = {**before, **row}
+        add(row.get('subject'), contribution(row), 1)
+    for crn in removed:
+        before = previous.get(crn)
+        if before is not None:
+            add(before.get('subject'), contribution(before), -1)
+
+    return {subject: delta for subject, delta in deltas.items() if any(delta)}
+
+class Rollups:
+    """Local copy of the per-subject totals, stored next to the mirror"""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        with connect(path, SCHEMA):
+            pass
+
+    def connect(self):
+        return connect(self.path)
+
+    def load(self, term_code):
+        """{subject: [total per measure]} for a term"""
+        with self.connect() as conn:
+            rows = conn.execute("SELECT * FROM rollups WHERE term = ?", (term_code,)).fetchall()
+        return {row['subject']: [row[m] for m in MEASURES] for row in rows}
+
+    def from_mirror(self, term_code):
+        """Totals recomputed from every mirrored section of a term"""
+        with self.connect() as conn:
+            rows = conn.execute("""
+                SELECT subject,
+                       COUNT(*),
+                       SUM(CASE WHEN open_section THEN 1 ELSE 0 END),
+                       SUM(MAX(COALESCE(seats_available, 0), 0)),
+                       SUM(COALESCE(waitlist_count, 0)),
+                       SUM(CASE WHEN has_uc_credit_limitation THEN 1 ELSE 0 END)
+                FROM courses WHERE term = ? GROUP BY subject
+            """, (term_code,)).fetchall()
+        return {row[0]: list(row[1:]) for row in rows}
+
+    def save(self, term_code, totals):
+        """Store totals for the given subjects; subjects with no sections left are dropped"""
+        with self.connect() as conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO rollups (term, subject, {', '.join(MEASURES)}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(term_code, subject, *values) for subject, values in totals.items() if values[0] > 0]
+            )
+            conn.executemany(
+                "DELETE FROM rollups WHERE term = ? AND subject = ?",
+                [(term_code, subject) for subject, values in totals.items() if values[0] <= 0]
+            )
+
+    def forget(self, term_code):
+        """Drop the local totals so the next run rebuilds them from the mirror"""
+        with self.connect() as conn:
+            conn.execute("DELETE FROM rollups WHERE term = ?", (term_code,))
+
+def rollup_rows(term_code, totals, **extra):
+    return [
+        {'term': term_code, 'subject': subject, **dict(zip(MEASURES, values)), **extra}
+        for subject, values in totals.items()
+    ]
+
+def sync_rollups(client, mirror_path, term_code, previous, changed, removed=(), snapshot=False):
+    """
+    Bring subject_rollups up to date for a term after the mirror was updated.
+    Returns the number of subjects rewritten.
+    """
+    rollups = Rollups(mirror_path)
+    totals = rollups.load(term_code)
+    now = datetime.now(timezone.utc)
+
+    rebuild = not totals
+    if not rebuild:
+        deltas = rollup_deltas(previous, changed, removed)
+        updated = {}
+        for subject, delta in deltas.items():
+            current = totals.get(subject, [0] * len(MEASURES))
+            updated[subject] = [value + change for value, change in zip(current, delta)]
+        totals.update(updated)
+    else:
+        updated = totals = rollups.from_mirror(term_code)
+
+    try:
+        if rebuild:
+            client.table('subject_rollups').delete().eq('term', term_code).execute()
+        rows = rollup_rows(term_code, {s: v for s, v in updated.items() if v[0] > 0}, updated_at=now.isoformat())
+        emptied = [subject for subject, values in updated.items() if values[0] <= 0]
+        for batch in chunks(rows):
+            client.table('subject_rollups').upsert(batch).execute()
+        for batch in chunks(emptied):
+            client.table('subject_rollups').delete().eq('term', term_code).in_('subject', batch).execute()
+
+        if snapshot:
+            taken_at = now.replace(minute=0, second=0, microsecond=0).isoformat()
+            live = {s: v for s, v in totals.items() if v[0] > 0}
+            for batch in chunks(rollup_rows(term_code, live, taken_at=taken_at)):
+                client.table('rollup_snapshots').upsert(batch).execute()
+    except Exception:
+        # Supabase may now be behind the deltas; rebuild the term next run
+        rollups.forget(term_code)
+        raise
+
+    # Only remember the new totals once Supabase has them
+    rollups.save(term_code, updated)
+    print(f"  📊 Rollups: {len(updated)} subject{'s' if len(updated) != 1 else ''} updated"
+          + (" (+ hourly snapshot)" if snapshot else ""))
+    return len(updated)
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Show the per-subject availability rollups kept next to the mirror')
+    parser.add_argument('--term', required=True, help='Term code (e.g., 202640)')
+    parser.add_argument('--db', default=DEFAULT_PATH, help=f'Mirror database (default: {DEFAULT_PATH})')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    totals = Rollups(args.db).load(args.term)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    print(f"{'subject':<8} " + ' '.join(f"{m:>13}" for m in MEASURES))
+    for subject, values in sorted(totals.items()):
+        print(f"{subject:<8} " + ' '.join(f"{v:>13}" for v in values))
+    sums = [sum(values[i] for values in totals.values()) for i in range(len(MEASURES))]
+    print(f"{'TOTAL':<8} " + ' '.join(f"{v:>13}" for v in sums))
+    print(f"\n⏱️  {elapsed:.1f} ms")
+
+if __name__ == "__main__":
+    main()
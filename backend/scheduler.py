@@ -8,9 +8,13 @@ import sys
 import logging
 import time
 import signal
+import json
 from datetime import datetime, timedelta
 import os
 
+import metrics
+from httpserve import QuietHandler, serve_in_background
+
 # Set up logging
 log_dir = "logs"
 os.makedirs(log_dir, exist_ok=True)
@@ -25,6 +29,9 @@ logging.basicConfig(
     ]
 )
 
+# Run report written by the orchestrator on every update
+METRICS_REPORT = os.path.join(log_dir, "metrics", "last_run.json")
+
 # Global flag for graceful shutdown
 running = True
 
@@ -151,22 +158,32 @@ def run_update(years_ahead=2):
         logging.info(f"Starting scheduled course update (processing {years_ahead} years ahead)")
         logging.info("=" * 60)
         
+        start = time.perf_counter()
+        
         # Run orchestrator with all future terms to automatically catch new terms
+        command = [sys.executable, "cli.py", "scrape", "--all-future", "--years", str(years_ahead),
+                   "--metrics-report", METRICS_REPORT]
+        
+        # Keep hourly availability snapshots while students are registering
+        if get_academic_period()[0] == 'registration':
+            command.append("--snapshots")
+        
         result = subprocess.run(
-            [sys.executable, "orchestrator.py", "--all-future", "--years", str(years_ahead)],
+            command,
             capture_output=True,
             text=True,
             cwd=os.path.dirname(os.path.abspath(__file__))
         )
         
+        metrics.set_gauge('scheduler_last_run_duration_seconds', round(time.perf_counter() - start, 2))
+        metrics.set_gauge('scheduler_last_run_timestamp', int(time.time()))
+        
         if result.returncode == 0:
+            metrics.inc('scheduler_runs_total', result='success')
             logging.info("✅ Course update completed successfully")
-            # Log summary (last few lines usually contain the summary)
-            output_lines = result.stdout.strip().split('\n')
-            for line in output_lines[-10:]:  # Last 10 lines usually have summary
-                if line.strip():
-                    logging.info(line)
+            log_run_report()
         else:
+            metrics.inc('scheduler_runs_total', result='failure')
             logging.error("❌ Course update failed")
             logging.error(result.stderr)
             logging.error(result.stdout)
@@ -180,12 +197,61 @@ def run_update(years_ahead=2):
         logging.error(traceback.format_exc())
         return False
 
-def run_as_service(years_ahead=2):
+def log_run_report():
+    """Log the per-term summary from the orchestrator's run report"""
+    try:
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), METRICS_REPORT), 'r') as f:
+            summary = json.load(f)['summary']
+    except (OSError, ValueError, KeyError) as e:
+        logging.warning(f"Could not read run report: {e}")
+        return
+    
+    for term in summary.get('terms', []):
+        logging.info(
+            f"   {term['term']}: {term['rows_uploaded']} uploaded, {term['rows_changed']} changed, "
+            f"{term['errors']} errors, {term['http_requests']} requests in {term['wall_seconds']}s"
+        )
+        if term.get('failed_subjects'):
+            logging.warning(f"   {term['term']}: subjects not scraped: {', '.join(term['failed_subjects'])}")
+    logging.info(
+        f"   Total: {summary.get('total_success', 0)} uploaded, {summary.get('total_errors', 0)} errors "
+        f"in {summary.get('duration_seconds')}s"
+    )
+
+class MetricsHandler(QuietHandler):
+    """Serves /metrics (Prometheus text) and /report (last run report as JSON)"""
+    
+    def do_GET(self):
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        report_path = os.path.join(base_dir, METRICS_REPORT)
+        
+        if self.path == '/metrics':
+            body = metrics.render_prometheus()
+            prom_path = os.path.splitext(report_path)[0] + '.prom'
+            if os.path.exists(prom_path):
+                with open(prom_path, 'r') as f:
+                    body += f.read()
+            self._send(200, 'text/plain; version=0.0.4', body)
+        elif self.path == '/report' and os.path.exists(report_path):
+            with open(report_path, 'r') as f:
+                self._send(200, 'application/json', f.read())
+        else:
+            self._send(404, 'text/plain', 'not found\n')
+
+def start_metrics_server(port):
+    """Serve metrics on the given port from a background thread"""
+    server = serve_in_background(port, MetricsHandler)
+    logging.info(f"📊 Metrics available at http://localhost:{port}/metrics and /report")
+    return server
+
+def run_as_service(years_ahead=2, metrics_port=None, feed_port=None):
     """
     Run as a background service with dynamic scheduling based on academic periods.
     
     Args:
         years_ahead: Number of years ahead to process
+        metrics_port: Port to serve /metrics and /report on (disabled if None)
+        feed_port: Port to stream section changes on (disabled if None)
     """
     try:
         import schedule
@@ -204,6 +270,13 @@ def run_as_service(years_ahead=2):
     logging.info("   Press Ctrl+C to stop")
     logging.info("=" * 60)
     
+    if metrics_port:
+        start_metrics_server(metrics_port)
+    if feed_port:
+        from changefeed import start_feed_server
+        start_feed_server(feed_port)
+        logging.info(f"📡 Change feed available at http://localhost:{feed_port}/changes")
+    
     # Run immediately on startup
     logging.info("Running initial update...")
     run_update(years_ahead=years_ahead)
@@ -284,6 +357,12 @@ Examples:
   # Run as service processing 3 years ahead:
   python scheduler.py --service --years 3
   
+  # Run as service with Prometheus metrics on port 9108:
+  python scheduler.py --service --metrics-port 9108
+  
+  # Run as service with the change feed on port 8765:
+  python scheduler.py --service --feed-port 8765
+  
   # Run once manually:
   python scheduler.py --once
         """
@@ -294,12 +373,16 @@ Examples:
                        help='Run as background service with dynamic scheduling')
     parser.add_argument('--years', type=int, default=2,
                        help='Number of years ahead to process (default: 2)')
+    parser.add_argument('--metrics-port', type=int,
+                       help='Serve Prometheus metrics on this port while running as a service')
+    parser.add_argument('--feed-port', type=int,
+                       help='Stream section changes (Server-Sent Events) on this port while running as a service')
     
     args = parser.parse_args()
     
     if args.service:
         # Run as background service
-        run_as_service(years_ahead=args.years)
+        run_as_service(years_ahead=args.years, metrics_port=args.metrics_port, feed_port=args.feed_port)
     else:
         # Run once (for manual testing)
         success = run_update(years_ahead=args.years)
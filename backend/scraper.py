@@ -1,18 +1,152 @@
 # scraper.py
 import requests
 import json
+import random
 import re
+import threading
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+import metrics
+from config import BASE_URL
+from descriptions import parse_description_html
+from searchresults import CHUNK_SIZE, SearchResults
+
+# Retry settings for requests to Banner
+REQUEST_TIMEOUT = 30
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 30
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class CircuitBreaker:
+    """
+    Shared by every scraper thread. After `failure_threshold` consecutive failed
+    requests the breaker opens and requests go out one at a time, `cooldown` seconds
+    apart (doubling while failures continue, up to `max_cooldown`). The first
+    successful request closes it again.
+    """
+    def __init__(self, failure_threshold=5, cooldown=2.0, max_cooldown=60.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.consecutive_failures = 0
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+    
+    def is_open(self):
+        return self.consecutive_failures >= self.failure_threshold
+    
+    def wait(self):
+        """Block until this thread may send its next request"""
+        with self.lock:
+            if not self.is_open():
+                return
+            now = time.monotonic()
+            extra_failures = self.consecutive_failures - self.failure_threshold
+            spacing = min(self.max_cooldown, self.cooldown * 2 ** min(extra_failures, 10))
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + spacing
+        if slot > now:
+            time.sleep(slot - now)
+    
+    def record_success(self):
+        with self.lock:
+            if self.is_open():
+                print(f"  ✓ Banner is responding again, resuming full speed")
+            self.consecutive_failures = 0
+            self.next_slot = 0.0
+    
+    def record_failure(self):
+        with self.lock:
+            self.consecutive_failures += 1
+            if self.consecutive_failures == self.failure_threshold:
+                print(f"  ⚠️  {self.failure_threshold} failed requests in a row, slowing down scraper")
+
+breaker = CircuitBreaker()
+
+# Optional callable run before every request, e.g. a rate limit shared between workers
+rate_limiter = None
+
+def endpoint_name(url):
+    """Short endpoint label for metrics, e.g. 'searchResults/searchResults'"""
+    return urlparse(url).path.split('/ssb/', 1)[-1]
+
+def request_with_retry(session, method, url, max_retries=MAX_RETRIES, **kwargs):
+    """
+    Send a request, retrying connection errors, timeouts and 429/5xx responses
+    with full-jitter exponential backoff. Other 4xx responses raise immediately.
+    With stream=True the body is still to be read, so the request's duration is
+    recorded by iter_body once it has been.
+    """
+    kwargs.setdefault('timeout', REQUEST_TIMEOUT)
+    endpoint = endpoint_name(url)
+    for attempt in range(max_retries + 1):
+        breaker.wait()
+        if rate_limiter is not None:
+            rate_limiter()
+        retry_after = None
+        start = time.perf_counter()
+        try:
+            response = session.request(method, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            metrics.inc('http_requests_total', endpoint=endpoint, status=type(e).__name__)
+            error = e
+        else:
+            if kwargs.get('stream') and response.status_code < 400:
+                response.headers_seconds = time.perf_counter() - start
+            else:
+                metrics.observe('http_request_duration_seconds', time.perf_counter() - start, endpoint=endpoint)
+            metrics.inc('http_requests_total', endpoint=endpoint, status=response.status_code)
+            if response.status_code not in RETRY_STATUS_CODES:
+                breaker.record_success()
+                response.raise_for_status()
+                return response
+            error = requests.HTTPError(f"{response.status_code} error for url: {response.url}", response=response)
+            retry_after = response.headers.get('Retry-After')
+            # Release the connection of a streamed response before retrying
+            response.close()
+        
+        breaker.record_failure()
+        if attempt == max_retries:
+            raise error
+        
+        metrics.inc('http_retries_total', endpoint=endpoint)
+        delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(BACKOFF_CAP, int(retry_after)))
+        time.sleep(delay)
+
+def iter_body(response, chunk_size=CHUNK_SIZE):
+    """
+    Chunks of a streamed response's body. Once it has been read, the request's
+    duration (time to headers plus time spent reading, not time the caller spends
+    between chunks) is recorded in http_request_duration_seconds.
+    """
+    elapsed = response.headers_seconds
+    chunks = response.iter_content(chunk_size)
+    try:
+        while True:
+            start = time.perf_counter()
+            chunk = next(chunks, None)
+            elapsed += time.perf_counter() - start
+            if chunk is None:
+                return
+            yield chunk
+    finally:
+        metrics.observe('http_request_duration_seconds', elapsed, endpoint=endpoint_name(response.url))
 
 def setup_session(term_code, base_url):
     """Set up session with Mt. SAC and return session + headers"""
     session = requests.Session()
-    session.get(f"{base_url}/term/termSelection?mode=search")
-    session.post(f"{base_url}/term/search?mode=search", data={"term": term_code})
-    response = session.get(f"{base_url}/classSearch/classSearch")
+    request_with_retry(session, "GET", f"{base_url}/term/termSelection?mode=search")
+    request_with_retry(session, "POST", f"{base_url}/term/search?mode=search", data={"term": term_code})
+    response = request_with_retry(session, "GET", f"{base_url}/classSearch/classSearch")
     
     token_match = re.search(r'<meta name="synchronizerToken" content="([^"]+)"', response.text)
+    if not token_match:
+        raise RuntimeError(f"No synchronizer token in class search page for term {term_code}")
     sync_token = token_match.group(1)
     
     headers = {
@@ -26,7 +160,7 @@ def setup_session(term_code, base_url):
 def search_subject(subject, term_code):
     """Search a single subject with fresh session"""
     try:
-        base_url = "https://prodrg.mtsac.edu/StudentRegistrationSsb/ssb"
+        base_url = BASE_URL
         session, headers = setup_session(term_code, base_url)
         
         # Search
@@ -40,13 +174,14 @@ def search_subject(subject, term_code):
             "sortDirection": "asc"
         }
         
-        response = session.post(search_url, data=form_data, headers=headers)
-        data = response.json()
+        with request_with_retry(session, "POST", search_url, data=form_data, headers=headers, stream=True) as response:
+            results = SearchResults(iter_body(response))
+            courses = list(results)
         
         return {
             'subject': subject,
-            'count': data['totalCount'],
-            'courses': data.get('data', [])
+            'count': results.meta.get('totalCount', len(courses)),
+            'courses': courses
         }
     except Exception as e:
         return {
@@ -58,56 +193,81 @@ def search_subject(subject, term_code):
 
 def get_subjects(term_code):
     """Get list of all subjects for a term"""
-    base_url = "https://prodrg.mtsac.edu/StudentRegistrationSsb/ssb"
+    base_url = BASE_URL
     session, headers = setup_session(term_code, base_url)
     
     subjects_url = f"{base_url}/classSearch/get_subject"
-    response = session.get(subjects_url, params={"term": term_code, "offset": 1, "max": 500}, headers=headers)
+    response = request_with_retry(session, "GET", subjects_url, params={"term": term_code, "offset": 1, "max": 500}, headers=headers)
     
     return response.json()
 
-def search_all_courses_direct(term_code):
+def iter_courses_direct(term_code, failed_subjects=None):
     """
-    Search for all courses directly without needing subjects list.
-    This is a fallback when get_subjects() returns empty.
+    Search for all courses directly without needing subjects list, yielding
+    each course as soon as it is parsed from the response.
+    Raises if the search fails part way, so a partial term is never mistaken for a whole one.
+    If the page held fewer courses than the term has, results are sorted by subject,
+    so the last subject seen is the one cut off: it is appended to `failed_subjects`
+    before the iterator finishes (later subjects weren't seen at all). Without a list
+    to report it in, a cut-off page raises instead.
     """
+    base_url = BASE_URL
+    session, headers = setup_session(term_code, base_url)
+    
+    # Try searching with empty subject (all courses)
+    search_url = f"{base_url}/searchResults/searchResults"
+    form_data = {
+        "txt_term": term_code,
+        "txt_subject": "",  # Empty subject to get all courses
+        "pageOffset": "0",
+        "pageMaxSize": "5000",  # Large page size to get all courses
+        "sortColumn": "subjectDescription",
+        "sortDirection": "asc"
+    }
+    
     try:
-        base_url = "https://prodrg.mtsac.edu/StudentRegistrationSsb/ssb"
-        session, headers = setup_session(term_code, base_url)
-        
-        # Try searching with empty subject (all courses)
-        search_url = f"{base_url}/searchResults/searchResults"
-        form_data = {
-            "txt_term": term_code,
-            "txt_subject": "",  # Empty subject to get all courses
-            "pageOffset": "0",
-            "pageMaxSize": "5000",  # Large page size to get all courses
-            "sortColumn": "subjectDescription",
-            "sortDirection": "asc"
-        }
-        
-        response = session.post(search_url, data=form_data, headers=headers)
-        data = response.json()
-        
-        courses = data.get('data') or []
-        total_count = data.get('totalCount', 0)
-        
-        # If there are more courses than page size, we need to paginate
-        all_courses = list(courses)
-        if total_count > len(courses):
-            print(f"  ⚠️  Found {total_count} total courses, but only retrieved {len(courses)} (pagination needed)")
-        
-        return all_courses
+        with request_with_retry(session, "POST", search_url, data=form_data, headers=headers, stream=True) as response:
+            results = SearchResults(iter_body(response))
+            last_subject = None
+            for course in results:
+                last_subject = course.get('subject')
+                yield course
     except Exception as e:
         print(f"  ⚠️  Direct search failed: {e}")
+        raise
+    
+    # If there are more courses than page size, we need to paginate
+    total_count = results.meta.get('totalCount') or 0
+    if total_count > results.count:
+        print(f"  ⚠️  Found {total_count} total courses, but only retrieved {results.count} (pagination needed)")
+        if failed_subjects is None:
+            raise RuntimeError(f"Direct search returned {results.count} of {total_count} courses")
+        if last_subject is not None:
+            print(f"  ⚠️  Courses of {last_subject} past the page limit are missing; treating it as failed")
+            failed_subjects.append(last_subject)
+    if results.count:
+        print(f"\n✅ Done! Scraped {results.count} courses via direct search")
+    else:
+        print("  ⚠️  Direct search also returned no courses")
+
+def search_all_courses_direct(term_code, failed_subjects=None):
+    """
+    Search for all courses directly without needing subjects list.
+    This is a fallback when get_subjects() returns empty.
+    See iter_courses_direct for `failed_subjects`.
+    """
+    try:
+        return list(iter_courses_direct(term_code, failed_subjects))
+    except Exception:
         return []
 
 def fetch_course_description(term_code, crn, session=None, headers=None):
     """
     Fetch course description and prerequisites for a specific course.
-    Returns a dictionary with 'description' and 'prerequisites' keys.
+    Returns a dictionary with 'description' and 'prerequisites' keys, plus an
+    'error' key if the request failed.
     """
-    base_url = "https://prodrg.mtsac.edu/StudentRegistrationSsb/ssb"
+    base_url = BASE_URL
     
     # Create session if not provided
     if session is None or headers is None:
@@ -120,52 +280,27 @@ def fetch_course_description(term_code, crn, session=None, headers=None):
     }
     
     try:
-        response = session.get(desc_url, params=params, headers=headers)
-        html = response.text
-        
-        # Parse the HTML to extract description and prerequisites
-        # The format is: <b>Advisory/Prerequisite:</b><i>prereq text</i>description text
-        import re
-        
-        description = ""
-        prerequisites = None
-        
-        # Remove HTML tags but keep the text
-        # Look for Advisory or Prerequisite sections
-        prereq_match = re.search(r'&lt;b&gt;(Advisory|Prerequisite|Corequisite):?\s*&lt;/b&gt;&lt;i&gt;(.*?)&lt;/i&gt;', html, re.IGNORECASE | re.DOTALL)
-        
-        if prereq_match:
-            prerequisites = prereq_match.group(2).strip()
-            # Remove the prerequisite section from the html to get clean description
-            html = html.replace(prereq_match.group(0), '')
-        
-        # Extract the description (remove all HTML tags)
-        desc_clean = re.sub(r'&lt;.*?&gt;', '', html)
-        desc_clean = re.sub(r'<.*?>', '', desc_clean)
-        desc_clean = re.sub(r'\s+', ' ', desc_clean).strip()
-        
-        # Remove common phrases that aren't part of the actual description
-        desc_clean = re.sub(r'(display course description|if there is a section description.*?|when there is no course.*?)', '', desc_clean, flags=re.IGNORECASE)
-        desc_clean = desc_clean.strip()
-        
-        if desc_clean and desc_clean not in ['', 'None', 'N/A']:
-            description = desc_clean
-        
-        return {
-            'description': description if description else None,
-            'prerequisites': prerequisites
-        }
+        response = request_with_retry(session, "GET", desc_url, params=params, headers=headers)
+        return parse_description_html(response.text)
     except Exception as e:
         print(f"  ⚠️  Error fetching description for CRN {crn}: {e}")
         return {
             'description': None,
-            'prerequisites': None
+            'prerequisites': None,
+            'error': str(e)
         }
 
-def scrape_all_courses(term_code, max_workers=5):
+def scrape_all_courses(term_code, max_workers=5, checkpoint=None, failed_subjects=None):
     """
     Scrape all courses for a term
-    Returns list of course dictionaries
+    Returns list of course dictionaries. If the term has no subject list, the
+    direct search is returned as an iterator instead, so its courses stream
+    into the transform one at a time rather than being held as one big list.
+    
+    Subjects already recorded in `checkpoint` are not searched again, and each newly
+    finished subject is added to it. Codes of subjects that still failed after retries,
+    or whose results were cut off by the page size, are appended to `failed_subjects`
+    if a list is given.
     """
     print(f"🔍 Starting scrape for term {term_code}...")
     
@@ -177,32 +312,63 @@ def scrape_all_courses(term_code, max_workers=5):
     # If no subjects found, try direct search as fallback
     if not subjects or len(subjects) == 0:
         print("  ⚠️  No subjects found, trying direct course search...")
-        all_courses = search_all_courses_direct(term_code)
-        if all_courses:
-            crns = set([c['courseReferenceNumber'] for c in all_courses])
-            print(f"\n✅ Done! Scraped {len(all_courses)} courses ({len(crns)} unique CRNs) via direct search")
-            return all_courses
-        else:
-            print("  ⚠️  Direct search also returned no courses")
-            return []
+        return iter_courses_direct(term_code, failed_subjects)
     
-    # Scrape with parallel threads
     all_courses = []
     
+    # Reuse subjects finished by an earlier, interrupted run
+    pending = subjects
+    if checkpoint is not None:
+        pending = []
+        for subject in subjects:
+            if subject['code'] in checkpoint.subjects:
+                # Popped so the checkpoint doesn't keep the raw courses alive
+                all_courses.extend(checkpoint.subjects.pop(subject['code']))
+            else:
+                pending.append(subject)
+        if len(pending) < len(subjects):
+            print(f"↩️  {len(subjects) - len(pending)} subjects restored from checkpoint\n")
+    
+    # Scrape with parallel threads
+    failures = []
+    truncated = []
+    
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {executor.submit(search_subject, subject, term_code): subject for subject in subjects}
+        futures = {executor.submit(search_subject, subject, term_code): subject for subject in pending}
         
         for i, future in enumerate(as_completed(futures), 1):
             result = future.result()
             subject = result['subject']
             
-            print(f"[{i}/{len(subjects)}] {subject['code']} - {subject['description']}... ", end="")
+            print(f"[{i}/{len(pending)}] {subject['code']} - {subject['description']}... ", end="")
+            
+            if 'error' in result:
+                print(f"✗ failed: {result['error']}")
+                failures.append(subject['code'])
+                continue
+            
+            if result['count'] > len(result['courses']):
+                # Uploaded, but not journaled and not trusted as the whole subject
+                print(f"⚠️  only {len(result['courses'])} of {result['count']} courses returned (page limit)")
+                truncated.append(subject['code'])
+                all_courses.extend(result['courses'])
+                continue
             
             if result['count'] > 0:
                 print(f"✓ {result['count']} courses")
                 all_courses.extend(result['courses'])
             else:
                 print("(no courses)")
+            
+            if checkpoint is not None:
+                checkpoint.add_subject(subject['code'], result['courses'])
+    
+    if failures:
+        print(f"\n⚠️  {len(failures)} subjects failed after retries: {', '.join(sorted(failures))}")
+    if truncated:
+        print(f"\n⚠️  {len(truncated)} subjects had more courses than one page: {', '.join(sorted(truncated))}")
+    if failed_subjects is not None:
+        failed_subjects.extend(failures + truncated)
     
     crns = set([c['courseReferenceNumber'] for c in all_courses])
     print(f"\n✅ Done! Scraped {len(all_courses)} courses ({len(crns)} unique CRNs)")
@@ -212,7 +378,8 @@ def scrape_all_courses(term_code, max_workers=5):
 # If running this file directly (for testing)
 if __name__ == "__main__":
     term_code = "202540"
-    courses = scrape_all_courses(term_code)
+    # The direct-search fallback streams; collect it before saving
+    courses = list(scrape_all_courses(term_code))
     
     # Save to JSON
     with open('mtsac_spring2026_final.json', 'w') as f:
@@ -0,0 +1,116 @@
+# searchresults.py
+"""
+Streaming parser for Banner searchResults responses.
+
+A direct search asks for up to 5000 sections at once. response.json() holds the
+whole body as bytes, then as a decoded string, and only then builds the full
+list of nested dicts, so the peak grows with the page size. SearchResults reads
+the body in chunks instead and yields the courses in the "data" array one at a
+time as they arrive. Each course is decoded straight out of the buffer by the C
+scanner behind json.JSONDecoder.raw_decode, and the buffer holds about one
+chunk. The other top-level fields (totalCount, pageOffset, ...) are collected
+in `meta`.
+
+Usage:
+    response = request_with_retry(session, "POST", search_url, data=form_data, headers=headers, stream=True)
+    results = SearchResults(iter_body(response))    # scraper.iter_body also times the download
+    for course in results:
+        ...
+    results.meta.get('totalCount')
+"""
+import codecs
+import json
+
+CHUNK_SIZE = 64 * 1024
+
+WHITESPACE = ' \t\n\r'
+DELIMITERS = frozenset(',:]}' + WHITESPACE)
+
+_decoder = json.JSONDecoder()
+
+class SearchResults:
+    """Courses from one searchResults response body, parsed as its chunks arrive"""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.text = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.meta = {}
+        self.count = 0
+
+    def _fill(self):
+        """Append the next chunk to the buffer, dropping what was already parsed"""
+        if self.eof:
+            raise ValueError("Unexpected end of searchResults response")
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.eof = True
+            text = self.text.decode(b'', final=True)
+        else:
+            text = self.text.decode(chunk)
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+
+    def _peek(self):
+        """Next non-whitespace character, without consuming it"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            self._fill()
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos} of searchResults response")
+        self.pos += 1
+
+    def _value(self):
+        """Decode one complete JSON value, reading more chunks until it is complete"""
+        self._peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            else:
+                # A number cut off by the end of a chunk ("12" of "1234", "1." of "1.5")
+                # still decodes, so only trust a value once the character after it is seen
+                if self.eof or (end < len(self.buffer) and self.buffer[end] in DELIMITERS):
+                    self.pos = end
+                    return value
+            self._fill()
+
+    def __iter__(self):
+        self._expect('{')
+        while True:
+            char = self._peek()
+            if char == '}':
+                self.pos += 1
+                return
+            if char == ',':
+                self.pos += 1
+                continue
+            key = self._value()
+            self._expect(':')
+            if key == 'data' and self._peek() == '[':
+                self.pos += 1
+                yield from self._items()
+            else:
+                self.meta[key] = self._value()
+
+    def _items(self):
+        while True:
+            char = self._peek()
+            if char == ']':
+                self.pos += 1
+                return
+            if char == ',':
+                self.pos += 1
+                continue
+            course = self._value()
+            self.count += 1
+            yield course
@@ -0,0 +1,226 @@
+# shards.py
+"""
+Static JSON shards of the course data, so the search page can be served from
+a CDN or any static host instead of querying Supabase.
+
+At the end of each term, the term is exported from the local mirror into:
+
+    manifest.json                          entry point: every term and the current file of each shard
+    terms/<term>.<hash>.json               subject list with section counts and seats
+    subjects/<term>/<SUBJ>.<hash>.json     sections of one subject, catalog text stored once per course
+    index/<term>.<hash>.json               compact search index (CRN, subject, number, title, instructor)
+
+Shard names carry a hash of their content, so they can be cached forever and
+only shards whose content changed are written. Each shard also gets .gz and,
+if the brotli package is installed, .br copies for hosts that serve
+precompressed files. Every file is written to a temporary name and renamed,
+and the manifest is written last, so readers never see a half-written shard
+or a manifest pointing at a missing one. Files dropped from the manifest are
+deleted one export later, so clients still holding the previous manifest keep
+working.
+
+Rows are stored as {"columns": [...], "rows": [[...], ...]} to keep the files small.
+
+Usage:
+    python shards.py --term 202640
+    python shards.py --all --output public/data
+"""
+import gzip
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+
+from mirror import DEFAULT_PATH, Mirror
+
+OUTPUT_DIR = os.environ.get("SACTRACK_SHARDS_DIR", os.path.join("public", "data"))
+
+# Shared by every section of a course, so stored once per course in subject shards
+COURSE_FIELDS = ['title', 'course_description', 'prerequisites', 'prerequisite_type']
+
+SECTION_FIELDS = [
+    'crn', 'course_number', 'section', 'credits_low', 'credits_high', 'instructor_name', 'instructor_email',
+    'max_enrollment', 'current_enrollment', 'seats_available', 'waitlist_capacity', 'waitlist_count',
+    'open_section', 'schedule_type', 'instructional_method', 'campus', 'meeting_days', 'meeting_time_start',
+    'meeting_time_end', 'meeting_building', 'meeting_room', 'start_date', 'end_date', 'has_uc_credit_limitation',
+]
+
+INDEX_FIELDS = ['crn', 'subject', 'course_number', 'title', 'instructor_name', 'open_section']
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+def encode(content):
+    """Canonical JSON bytes, so equal content always hashes the same"""
+    return json.dumps(content, sort_keys=True, separators=(',', ':'), default=str).encode()
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:12]
+
+def write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def shard_paths(path):
+    """A shard and its precompressed copies"""
+    return [path, f"{path}.gz"] + ([f"{path}.br"] if brotli is not None else [])
+
+def write_shard(output_dir, name, content):
+    """
+    Write `content` as <name>.<hash>.json (plus compressed copies) unless that
+    exact shard already exists. Returns (relative path, whether it was written).
+    """
+    data = encode(content)
+    relative = f"{name}.{content_hash(data)}.json"
+    path = os.path.join(output_dir, relative)
+    if all(os.path.exists(p) for p in shard_paths(path)):
+        return relative, False
+
+    write_atomic(f"{path}.gz", gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        write_atomic(f"{path}.br", brotli.compress(data, quality=11))
+    # The plain file last: its presence marks the shard complete
+    write_atomic(path, data)
+    return relative, True
+
+def table(rows, fields):
+    return {'columns': fields, 'rows': [[row.get(field) for field in fields] for row in rows]}
+
+def sort_key(row):
+    number = row.get('course_number') or ''
+    digits = ''.join(ch for ch in number if ch.isdigit())
+    return (int(digits) if digits else 0, number, row.get('section') or '', row.get('crn'))
+
+def subject_shard(term_code, subject, rows):
+    courses = {}
+    for row in rows:
+        courses.setdefault(row.get('course_number'), {field: row.get(field) for field in COURSE_FIELDS})
+    return {
+        'term': term_code,
+        'subject': subject,
+        'courses': courses,
+        'sections': table(rows, SECTION_FIELDS),
+    }
+
+def subject_summary(subject, rows):
+    return {
+        'subject': subject,
+        'sections': len(rows),
+        'open_sections': sum(1 for row in rows if row.get('open_section')),
+        'seats_left': sum(max(row.get('seats_available') or 0, 0) for row in rows),
+        'waitlisted': sum(row.get('waitlist_count') or 0 for row in rows),
+    }
+
+def load_manifest(output_dir):
+    path = os.path.join(output_dir, 'manifest.json')
+    if not os.path.exists(path):
+        return {'version': 0, 'terms': {}}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def manifest_files(manifest):
+    files = set()
+    for entry in manifest.get('terms', {}).values():
+        files.add(entry['shard'])
+        files.add(entry['index'])
+        files.update(subject['shard'] for subject in entry['subjects'].values())
+    return files
+
+def remove_stale(output_dir, keep):
+    """Delete shards no longer referenced by the current or previous manifest"""
+    removed = 0
+    for directory in ('terms', 'subjects', 'index'):
+        root = os.path.join(output_dir, directory)
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                relative = os.path.relpath(path, output_dir).replace(os.sep, '/')
+                base = relative[:-3] if relative.endswith(('.gz', '.br')) else relative
+                if base not in keep:
+                    os.remove(path)
+                    removed += 1
+    return removed
+
+def export_term(term_code, mirror_path=DEFAULT_PATH, output_dir=OUTPUT_DIR):
+    """
+    Export a term's mirrored sections as static shards and update the manifest.
+    Returns (shards written, shards unchanged).
+    """
+    rows = sorted(Mirror(mirror_path).existing_rows(term_code).values(), key=sort_key)
+    previous = load_manifest(output_dir)
+    manifest = {'version': previous.get('version', 0), 'terms': dict(previous.get('terms', {}))}
+
+    written = unchanged = 0
+
+    def shard(name, content):
+        nonlocal written, unchanged
+        relative, was_written = write_shard(output_dir, name, content)
+        if was_written:
+            written += 1
+        else:
+            unchanged += 1
+        return relative
+
+    if rows:
+        by_subject = {}
+        for row in rows:
+            by_subject.setdefault(row.get('subject'), []).append(row)
+
+        subjects = {
+            subject: {
+                'shard': shard(f"subjects/{term_code}/{subject}", subject_shard(term_code, subject, subject_rows)),
+                'sections': len(subject_rows),
+            }
+            for subject, subject_rows in sorted(by_subject.items())
+        }
+        term_desc = rows[0].get('term_desc')
+        summaries = [subject_summary(subject, subject_rows) for subject, subject_rows in sorted(by_subject.items())]
+        manifest['terms'][term_code] = {
+            'term_desc': term_desc,
+            'sections': len(rows),
+            'shard': shard(f"terms/{term_code}", {'term': term_code, 'term_desc': term_desc, 'subjects': summaries}),
+            'index': shard(f"index/{term_code}", {'term': term_code, **table(rows, INDEX_FIELDS)}),
+            'subjects': subjects,
+        }
+    else:
+        manifest['terms'].pop(term_code, None)
+
+    if written or manifest['terms'] != previous.get('terms', {}):
+        manifest['version'] += 1
+        manifest['generated_at'] = datetime.now().isoformat()
+        write_atomic(os.path.join(output_dir, 'manifest.json'), json.dumps(manifest, indent=1).encode())
+        remove_stale(output_dir, manifest_files(manifest) | manifest_files(previous))
+
+    return written, unchanged
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Export mirrored courses as static JSON shards')
+    parser.add_argument('--term', action='append', help='Term code to export (repeatable)')
+    parser.add_argument('--all', action='store_true', help='Export every mirrored term')
+    parser.add_argument('--output', default=OUTPUT_DIR, help=f'Output directory (default: {OUTPUT_DIR})')
+    parser.add_argument('--db', default=DEFAULT_PATH, help=f'Mirror database (default: {DEFAULT_PATH})')
+    args = parser.parse_args()
+
+    terms = args.term or []
+    if args.all:
+        with Mirror(args.db).connect() as conn:
+            terms = [row[0] for row in conn.execute("SELECT DISTINCT term FROM courses ORDER BY term")]
+    if not terms:
+        parser.error('give --term or --all')
+
+    for term_code in terms:
+        start = time.perf_counter()
+        written, unchanged = export_term(term_code, args.db, args.output)
+        print(f"🗂️  {term_code}: {written} shards written, {unchanged} unchanged "
+              f"({(time.perf_counter() - start) * 1000:.0f} ms)")
+
+if __name__ == "__main__":
+    main()
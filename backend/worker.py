@@ -0,0 +1,53 @@
+# worker.py
+"""
+Scrape worker: claims (term, subject) and (term, crn) tasks from the shared
+work queue and runs them. Start as many as you like, on this host or on others
+that share the queue database; all of them stay under one global rate limit.
+A database shared between hosts needs a filesystem with working POSIX locks
+(see workqueue.py).
+
+Usage:
+    python worker.py --threads 4 --rate 5
+    python worker.py --db /mnt/shared/workqueue.sqlite --threads 8
+"""
+import argparse
+import signal
+import socket
+import os
+import threading
+
+from workqueue import DEFAULT_DB, WorkQueue, enable_global_rate_limit, run_worker
+
+def main():
+    parser = argparse.ArgumentParser(description='Run scrape tasks from the shared work queue')
+    parser.add_argument('--db', default=DEFAULT_DB, help=f'Work queue database (default: {DEFAULT_DB})')
+    parser.add_argument('--threads', type=int, default=4, help='Worker threads in this process (default: 4)')
+    parser.add_argument('--rate', type=float, default=5.0,
+                        help='Global Banner requests per second across all workers (default: 5)')
+    args = parser.parse_args()
+    
+    queue = WorkQueue(args.db)
+    enable_global_rate_limit(queue, args.rate)
+    
+    stop_event = threading.Event()
+    signal.signal(signal.SIGINT, lambda sig, frame: stop_event.set())
+    signal.signal(signal.SIGTERM, lambda sig, frame: stop_event.set())
+    
+    print(f"👷 Worker started on {socket.gethostname()} ({args.threads} threads)")
+    print(f"   Queue: {args.db}")
+    print(f"   Global rate limit: {args.rate} requests/s")
+    
+    threads = []
+    for i in range(args.threads):
+        owner = f"worker-{socket.gethostname()}-{os.getpid()}-{i}"
+        thread = threading.Thread(target=run_worker, args=(queue, owner, stop_event))
+        thread.start()
+        threads.append(thread)
+    
+    # Unfinished tasks are released when their leases run out
+    for thread in threads:
+        thread.join()
+    print("Worker stopped.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+# workqueue.py
+"""
+Durable work queue so several worker processes (or hosts sharing the database
+file) can split a term refresh.
+
+The orchestrator publishes (term, subject) searches and (term, crn) description
+fetches as tasks in a SQLite database. Workers (worker.py) claim tasks under a
+lease; a task whose lease runs out without being completed becomes visible
+again and is picked up by another worker. Failed tasks are retried with backoff
+up to MAX_ATTEMPTS. All workers share one request rate limit stored in the same
+database, so adding workers never pushes Banner past the global rate.
+
+Hosts can share the database over a network filesystem, as long as it
+implements POSIX byte-range locks (fcntl) consistently across clients, e.g.
+NFSv3/v4 with locking enabled (not mounted with nolock or local_lock). SQLite's
+WAL mode needs shared memory between all processes and cannot work there, so
+the queue always uses the rollback journal; its transactions are small enough
+that the extra locking costs little even on one host.
+"""
+import json
+import os
+import random
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_DB = os.environ.get("SACTRACK_QUEUE_DB", os.path.join("queue", "workqueue.sqlite"))
+
+LEASE_SECONDS = 300
+MAX_ATTEMPTS = 5
+RETRY_BACKOFF = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    term TEXT NOT NULL,
+    task_key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result TEXT,
+    error TEXT,
+    updated_at REAL,
+    UNIQUE (run_id, kind, term, task_key)
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_claim ON tasks(status, available_at, lease_expires);
+CREATE INDEX IF NOT EXISTS idx_tasks_run ON tasks(run_id, kind, term, status);
+CREATE TABLE IF NOT EXISTS rate_limits (
+    name TEXT PRIMARY KEY,
+    next_slot REAL NOT NULL
+);
+"""
+
+class WorkQueue:
+    """SQLite-backed task queue with leases and visibility timeouts"""
+
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            # Also switches back a database left in WAL mode by an older version
+            conn.execute("PRAGMA journal_mode=DELETE")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # A connection per call keeps the queue safe to share between threads;
+        # closing it mid-transaction rolls the transaction back
+        conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def publish(self, run_id, kind, term, tasks):
+        """
+        Add tasks for a run. `tasks` maps a unique key (subject code, CRN) to a
+        JSON-serializable payload. Keys already published for the run keep their
+        finished results, so republishing after a crash only redoes what is left;
+        tasks that had failed for good get a fresh set of attempts.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT OR IGNORE INTO tasks (run_id, kind, term, task_key, payload, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                [(run_id, kind, term, key, json.dumps(payload), now) for key, payload in tasks.items()]
+            )
+            conn.execute(
+                """UPDATE tasks SET status = 'pending', attempts = 0, available_at = 0, updated_at = ?
+                   WHERE run_id = ? AND kind = ? AND term = ? AND status = 'failed'""",
+                (now, run_id, kind, term)
+            )
+            conn.execute("COMMIT")
+
+    def claim(self, owner, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        """
+        Lease the oldest available task to `owner`, or return None. A task whose
+        lease expired after its last attempt (the worker died every time) is
+        marked failed instead of being handed out again.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                """UPDATE tasks SET status = 'failed', error = 'lease expired on the last attempt',
+                   lease_owner = NULL, lease_expires = NULL, updated_at = ?
+                   WHERE status = 'leased' AND lease_expires <= ? AND attempts >= ?""",
+                (now, now, max_attempts)
+            )
+            row = conn.execute(
+                """SELECT * FROM tasks
+                   WHERE (status = 'pending' AND available_at <= ?)
+                      OR (status = 'leased' AND lease_expires <= ?)
+                   ORDER BY id LIMIT 1""",
+                (now, now)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                """UPDATE tasks SET status = 'leased', lease_owner = ?, lease_expires = ?,
+                   attempts = attempts + 1, updated_at = ? WHERE id = ?""",
+                (owner, now + lease_seconds, now, row['id'])
+            )
+            conn.execute("COMMIT")
+
+        task = dict(row)
+        task['payload'] = json.loads(task['payload'])
+        task['attempts'] += 1
+        return task
+
+    def complete(self, task_id, owner, result):
+        """Store a task's result. Returns False if the lease was lost to another worker."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """UPDATE tasks SET status = 'done', result = ?, error = NULL, lease_owner = NULL,
+                   lease_expires = NULL, updated_at = ?
+                   WHERE id = ? AND status = 'leased' AND lease_owner = ?""",
+                (json.dumps(result), time.time(), task_id, owner)
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, task_id, owner, error, attempts, max_attempts=MAX_ATTEMPTS):
+        """Release a task after an error; it is retried later until max_attempts is reached"""
+        now = time.time()
+        if attempts >= max_attempts:
+            status, available_at = 'failed', now
+        else:
+            status, available_at = 'pending', now + random.uniform(0, RETRY_BACKOFF * 2 ** (attempts - 1))
+        with self._connect() as conn:
+            conn.execute(
+                """UPDATE tasks SET status = ?, error = ?, available_at = ?, lease_owner = NULL,
+                   lease_expires = NULL, updated_at = ?
+                   WHERE id = ? AND status = 'leased' AND lease_owner = ?""",
+                (status, str(error), available_at, now, task_id, owner)
+            )
+
+    def progress(self, run_id, kind, term):
+        """Task counts by status for one stage of a run"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) FROM tasks WHERE run_id = ? AND kind = ? AND term = ? GROUP BY status",
+                (run_id, kind, term)
+            ).fetchall()
+        counts = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        counts.update({status: count for status, count in rows})
+        return counts
+
+    def results(self, run_id, kind, term):
+        """(results by key, errors by key) for the finished tasks of one stage"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT task_key, status, result, error FROM tasks WHERE run_id = ? AND kind = ? AND term = ?",
+                (run_id, kind, term)
+            ).fetchall()
+        results = {row['task_key']: json.loads(row['result']) for row in rows if row['status'] == 'done'}
+        errors = {row['task_key']: row['error'] for row in rows if row['status'] == 'failed'}
+        return results, errors
+
+    def purge(self, run_id):
+        """Delete all tasks of a finished run"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM tasks WHERE run_id = ?", (run_id,))
+
+    def acquire_rate_slot(self, name, interval):
+        """
+        Block until the next request slot of a global rate limit shared by all
+        workers using this database. One slot is handed out every `interval` seconds.
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT next_slot FROM rate_limits WHERE name = ?", (name,)).fetchone()
+            now = time.time()
+            slot = max(now, row['next_slot'] if row else 0)
+            conn.execute(
+                "INSERT INTO rate_limits (name, next_slot) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET next_slot = excluded.next_slot",
+                (name, slot + interval)
+            )
+            conn.execute("COMMIT")
+        if slot > now:
+            time.sleep(slot - now)
+
+    def wait_for(self, run_id, kind, term, timeout=3600, poll_seconds=2):
+        """Wait until every task of a stage is done or failed. Returns False on timeout."""
+        deadline = time.time() + timeout
+        last = None
+        while True:
+            counts = self.progress(run_id, kind, term)
+            if counts != last:
+                total = sum(counts.values())
+                print(f"    ⏳ {kind}: {counts['done']}/{total} done, {counts['leased']} in progress, "
+                      f"{counts['pending']} waiting, {counts['failed']} failed")
+                last = counts
+            if counts['pending'] == 0 and counts['leased'] == 0:
+                return True
+            if time.time() > deadline:
+                print(f"    ⚠️  Timed out waiting for {kind} tasks (are any workers running?)")
+                return False
+            time.sleep(poll_seconds)
+
+_sessions = threading.local()
+
+def _session_for(term_code):
+    """One Banner session per worker thread and term"""
+    from config import BASE_URL
+    from scraper import setup_session
+
+    sessions = getattr(_sessions, 'by_term', None)
+    if sessions is None:
+        sessions = _sessions.by_term = {}
+    if term_code not in sessions:
+        sessions[term_code] = setup_session(term_code, BASE_URL)
+    return sessions[term_code]
+
+def execute_task(task):
+    """Run one task and return its result; raises if the work failed"""
+    from scraper import fetch_course_description, search_subject
+
+    if task['kind'] == 'subject':
+        result = search_subject(task['payload'], task['term'])
+        if 'error' in result:
+            raise RuntimeError(result['error'])
+        if result['count'] > len(result['courses']):
+            # A cut-off subject would look like it lost the sections past the page
+            raise RuntimeError(f"only {len(result['courses'])} of {result['count']} courses returned (page limit)")
+        return result['courses']
+
+    if task['kind'] == 'description':
+        session, headers = _session_for(task['term'])
+        result = fetch_course_description(task['term'], task['task_key'], session=session, headers=headers)
+        if 'error' in result:
+            # The session may have expired; start a new one on the next attempt
+            _sessions.by_term.pop(task['term'], None)
+            raise RuntimeError(result['error'])
+        return result
+
+    raise ValueError(f"Unknown task kind: {task['kind']}")
+
+def run_worker(queue, owner, stop_event, idle_seconds=1.0, lease_seconds=LEASE_SECONDS):
+    """Claim and run tasks until `stop_event` is set"""
+    while not stop_event.is_set():
+        task = queue.claim(owner, lease_seconds)
+        if task is None:
+            stop_event.wait(idle_seconds)
+            continue
+        try:
+            result = execute_task(task)
+        except Exception as e:
+            queue.fail(task['id'], owner, e, task['attempts'])
+        else:
+            if not queue.complete(task['id'], owner, result):
+                print(f"  ⚠️  Lease on {task['kind']} {task['task_key']} expired before it finished")
+
+def enable_global_rate_limit(queue, requests_per_second):
+    """Route every Banner request in this process through the queue's shared rate limit"""
+    import scraper
+
+    interval = 1.0 / requests_per_second
+    scraper.rate_limiter = lambda: queue.acquire_rate_slot('banner', interval)
+
+def start_local_workers(queue, count, name='local'):
+    """Start worker threads in this process; returns the event that stops them"""
+    stop_event = threading.Event()
+    for i in range(count):
+        owner = f"{name}-{socket.gethostname()}-{os.getpid()}-{i}"
+        threading.Thread(target=run_worker, args=(queue, owner, stop_event), daemon=True).start()
+    return stop_event